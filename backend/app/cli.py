@@ -0,0 +1,164 @@
+"""Administrative command line interface (``bookstore-admin``).
+
+Run from the backend directory, e.g.:
+
+    python -m app.cli migrate
+    python -m app.cli seed
+    python -m app.cli commission-runs start --chunk-size 5000 --max-chunks 20
+    python -m app.cli commission-runs resume <run_id>
+    python -m app.cli commission-runs status [<run_id>]
+    python -m app.cli ranks recompute [--apply]
+    python -m app.cli ranks resume <run_id>
+    python -m app.cli check-query-plans
+"""
+
+import argparse
+import json
+import sys
+
+from .database import SchemaVersionError, migrate_database, seed_database, verify_schema_version
+from .database.query_plans import find_full_scans
+from .database.session import db_session
+from .services import ranks, weekly_commissions
+
+
+def _print_json(data) -> None:
+    print(json.dumps(data, indent=2, default=str))
+
+
+def _migrate(args: argparse.Namespace) -> int:
+    print(f"Database schema at version {migrate_database()}")
+    return 0
+
+
+def _seed(args: argparse.Namespace) -> int:
+    seed_database()
+    print("Seed data inserted")
+    return 0
+
+
+def _commission_runs_start(args: argparse.Namespace) -> int:
+    run_id = weekly_commissions.start_commission_run(chunk_size=args.chunk_size)
+    print(f"Started commission run {run_id}")
+    _print_json(weekly_commissions.resume_commission_run(run_id, max_chunks=args.max_chunks))
+    return 0
+
+
+def _commission_runs_resume(args: argparse.Namespace) -> int:
+    _print_json(weekly_commissions.resume_commission_run(args.run_id, max_chunks=args.max_chunks))
+    return 0
+
+
+def _commission_runs_status(args: argparse.Namespace) -> int:
+    if not args.run_id:
+        _print_json(weekly_commissions.list_commission_runs(limit=args.limit))
+        return 0
+
+    run = weekly_commissions.get_commission_run(args.run_id)
+    if not run:
+        print(f"Commission run {args.run_id} not found", file=sys.stderr)
+        return 1
+    run["chunks"] = weekly_commissions.get_commission_run_chunks(args.run_id)
+    _print_json(run)
+    return 0
+
+
+def _ranks_recompute(args: argparse.Namespace) -> int:
+    if args.apply:
+        run_id = ranks.start_rank_recompute_run(
+            chunk_size=args.chunk_size, start_after_user_id=args.start_after_user_id
+        )
+        print(f"Started rank recompute run {run_id}")
+        _print_json(ranks.resume_rank_recompute_run(run_id, max_chunks=args.max_chunks))
+        return 0
+
+    _print_json(ranks.recompute_all_ranks(
+        dry_run=True,
+        chunk_size=args.chunk_size,
+        start_after_user_id=args.start_after_user_id,
+        max_chunks=args.max_chunks,
+        report_limit=args.report_limit,
+    ))
+    return 0
+
+
+def _ranks_resume(args: argparse.Namespace) -> int:
+    _print_json(ranks.resume_rank_recompute_run(args.run_id, max_chunks=args.max_chunks))
+    return 0
+
+
+def _check_query_plans(args: argparse.Namespace) -> int:
+    with db_session(read_only=True) as conn:
+        issues, checked, skipped = find_full_scans(conn)
+    for issue in issues:
+        print(issue)
+    print(f"{checked} statements checked, {skipped} dynamic fragments skipped, {len(issues)} full table scans")
+    return 1 if issues else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bookstore-admin", description="Bookstore administration commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Create the schema and apply pending migrations")
+    migrate.set_defaults(handler=_migrate, skip_schema_check=True)
+
+    seed = commands.add_parser("seed", help="Insert the default admin, demo user and sample catalog")
+    seed.set_defaults(handler=_seed)
+
+    runs = commands.add_parser("commission-runs", help="Start, resume or inspect weekly settlement runs")
+    run_commands = runs.add_subparsers(dest="action", required=True)
+
+    start = run_commands.add_parser("start", help="Start a new settlement run over pending commissions")
+    start.add_argument("--chunk-size", type=int, default=None, help="Users settled per chunk")
+    start.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks")
+    start.set_defaults(handler=_commission_runs_start)
+
+    resume = run_commands.add_parser("resume", help="Resume a run from its last checkpoint")
+    resume.add_argument("run_id")
+    resume.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks")
+    resume.set_defaults(handler=_commission_runs_resume)
+
+    status = run_commands.add_parser("status", help="Show recent runs or one run with its chunks")
+    status.add_argument("run_id", nargs="?")
+    status.add_argument("--limit", type=int, default=20)
+    status.set_defaults(handler=_commission_runs_status)
+
+    rank_parser = commands.add_parser("ranks", help="Recompute ranks and rank bonuses")
+    rank_commands = rank_parser.add_subparsers(dest="action", required=True)
+
+    recompute = rank_commands.add_parser("recompute", help="Recompute all ranks (dry run unless --apply)")
+    recompute.add_argument("--apply", action="store_true", help="Write rank changes and bonuses")
+    recompute.add_argument("--chunk-size", type=int, default=None, help="Users per chunk")
+    recompute.add_argument("--start-after-user-id", type=int, default=0, help="Continue after this user id")
+    recompute.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks")
+    recompute.add_argument("--report-limit", type=int, default=100, help="Changed users listed in the report")
+    recompute.set_defaults(handler=_ranks_recompute)
+
+    rank_resume = rank_commands.add_parser("resume", help="Resume an applied recompute run from its checkpoint")
+    rank_resume.add_argument("run_id")
+    rank_resume.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks")
+    rank_resume.set_defaults(handler=_ranks_resume)
+
+    plans = commands.add_parser(
+        "check-query-plans",
+        help="Fail if any service or community query plans a full table scan",
+    )
+    plans.set_defaults(handler=_check_query_plans)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if not getattr(args, "skip_schema_check", False):
+            verify_schema_version()
+        return args.handler(args)
+    except (ValueError, SchemaVersionError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,9 +8,48 @@ from pydantic_settings import BaseSettings
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Upper bound on referral depth kept in user_ancestors, when backfilling, when
+# create_user extends it and when commissions walk it; also stops recursion on
+# cyclic data.
+MAX_REFERRAL_DEPTH = 10000
+
 
 class Settings(BaseSettings):
     database_path: Path = BASE_DIR.parent / "bookstore.db"
+    db_auto_migrate: bool = False  # migrate and seed on startup (local development only)
+    db_pool_size: int = 5
+    db_pool_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_pre_ping_seconds: float = 30.0
+    db_pool_recycle_seconds: float = 3600.0
+    db_journal_mode: str = "wal"
+    db_synchronous: str = "normal"
+    db_cache_size_kib: int = 20000
+    db_mmap_size: int = 256 * 1024 * 1024
+    db_temp_store: str = "memory"
+    db_busy_timeout_ms: int = 5000
+    db_async_readers: int = 4  # reader threads serving async endpoints
+    compensation_worker_enabled: bool = True
+    compensation_worker_poll_seconds: float = 2.0
+    compensation_worker_batch_size: int = 50
+    compensation_max_attempts: int = 5
+    compensation_retry_base_seconds: float = 30.0
+    commission_run_chunk_size: int = 10000
+    rank_recompute_chunk_size: int = 10000
+    rank_recompute_dry_run_max_chunks: int = 5  # per admin request; continue with last_user_id
+    user_cache_max_entries: int = 10000
+    user_cache_ttl_seconds: float = 30.0
+    token_cache_max_entries: int = 10000
+    password_hash_method: str = "scrypt:32768:8:1"  # werkzeug method, e.g. pbkdf2:sha256:600000
+    password_hash_salt_length: int = 16
+    password_rehash_on_login: bool = True  # upgrade hashes that do not match the policy
+    password_hash_executor: str = "process"  # process or thread
+    password_hash_workers: int = 2
+    scheduler_executor: str = "thread"  # thread or process
+    scheduler_max_workers: int = 2
+    scheduler_lease_ttl_seconds: float = 60.0
+    scheduler_lease_renew_seconds: float = 15.0
+    scheduler_misfire_grace_seconds: int = 3 * 60 * 60  # catch up within the Monday 4-7 PM window
     secret_key: str = "change-this-secret"
     access_token_exp_minutes: int = 60 * 12
     refresh_token_exp_days: int = 7
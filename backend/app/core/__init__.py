@@ -1,22 +1,31 @@
 """Core utilities."""
 
-from .dependencies import get_current_admin, get_current_user, get_optional_user
+from .dependencies import get_current_admin, get_current_user, get_db_session, get_optional_user
 from .security import (
     create_access_token,
     create_refresh_token,
     decode_token,
     hash_password,
+    hash_password_async,
+    password_needs_rehash,
     verify_password,
+    verify_password_and_rehash_async,
+    verify_password_async,
 )
 
 __all__ = [
     "get_current_admin",
     "get_current_user",
+    "get_db_session",
     "get_optional_user",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
     "hash_password",
+    "hash_password_async",
+    "password_needs_rehash",
     "verify_password",
+    "verify_password_and_rehash_async",
+    "verify_password_async",
 ]
 
@@ -1,34 +1,69 @@
 """Common FastAPI dependencies."""
 
+from collections.abc import AsyncGenerator
+import sqlite3
+
 from fastapi import Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 
 from ..core.security import decode_token
+from ..database.session import (
+    bind_connection,
+    get_pool,
+    pop_commit_callbacks,
+    run_commit_callbacks,
+    unbind_connection,
+)
 from ..models.schemas import TokenPayload
-from ..services.users import get_user_by_id
+from ..services.users import get_cached_user_by_id_async
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+async def get_db_session() -> AsyncGenerator[sqlite3.Connection, None]:
+    """Yield one connection and transaction for the whole request.
+
+    Service calls made while handling the request join this connection through
+    ``db_session()``, so the endpoint commits or rolls back as a single unit.
+    Declare it before other dependencies that touch the database so they join too.
+    """
+    pool = get_pool()
+    conn = await run_in_threadpool(pool.acquire)
+    token = bind_connection(conn)
+    try:
+        yield conn
+        await run_in_threadpool(conn.commit)
+    except Exception:
+        await run_in_threadpool(conn.rollback)
+        raise
+    finally:
+        callbacks = pop_commit_callbacks(conn)
+        unbind_connection(token)
+        pool.release(conn)
+    # Only reached after a successful commit
+    run_commit_callbacks(callbacks)
+
+
 def _require_role(payload: TokenPayload, expected_role: str) -> None:
     if payload.role != expected_role:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = decode_token(token)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     _require_role(payload, "user")
-    user = get_user_by_id(int(payload.sub))
+    user = await get_cached_user_by_id_async(int(payload.sub))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
 
-def get_current_admin(token: str = Depends(oauth2_scheme)) -> str:
+async def get_current_admin(token: str = Depends(oauth2_scheme)) -> str:
     try:
         payload = decode_token(token)
     except ValueError as exc:
@@ -37,7 +72,7 @@ def get_current_admin(token: str = Depends(oauth2_scheme)) -> str:
     return payload.sub
 
 
-def get_optional_user(authorization: str | None = Header(default=None)):
+async def get_optional_user(authorization: str | None = Header(default=None)):
     if not authorization:
         return None
     scheme, _, token = authorization.partition(" ")
@@ -49,7 +84,7 @@ def get_optional_user(authorization: str | None = Header(default=None)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     if payload.role != "user":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
-    user = get_user_by_id(int(payload.sub))
+    user = await get_cached_user_by_id_async(int(payload.sub))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
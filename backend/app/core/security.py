@@ -1,6 +1,11 @@
 """Security helpers for hashing and JWT handling."""
 
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
 from jose import ExpiredSignatureError, JWTError, jwt
@@ -8,16 +13,107 @@ from werkzeug.security import check_password_hash, generate_password_hash
 
 from ..config import settings
 from ..models.schemas import TokenPayload
+from .cache import TTLCache
+
+# Verified payloads by token string, each kept until its own exp
+_token_cache = TTLCache(settings.token_cache_max_entries)
+
+# Hashing is deliberately CPU-heavy, so request handlers run it in a small
+# dedicated pool instead of the event loop or the shared request threadpool
+_hash_executor: Executor | None = None
+_hash_executor_lock = threading.Lock()
 
 
 def hash_password(plain_password: str) -> str:
-    return generate_password_hash(plain_password)
+    return generate_password_hash(
+        plain_password,
+        method=settings.password_hash_method,
+        salt_length=settings.password_hash_salt_length,
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return check_password_hash(hashed_password, plain_password)
 
 
+@lru_cache
+def _policy_method() -> str:
+    # werkzeug fills in defaults (e.g. "pbkdf2" -> "pbkdf2:sha256:600000"),
+    # so take the canonical form from a real hash. This costs one full hash;
+    # request paths only reach it through the hashing pool.
+    return hash_password("").split("$", 1)[0]
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with a different method, cost or salt length."""
+    method, _, rest = hashed_password.partition("$")
+    salt = rest.split("$", 1)[0]
+    return method != _policy_method() or len(salt) != settings.password_hash_salt_length
+
+
+def verify_password_and_rehash(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password; if it matches an outdated hash, also return a policy-conforming one."""
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if settings.password_rehash_on_login and password_needs_rehash(hashed_password):
+        return True, hash_password(plain_password)
+    return True, None
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            if settings.password_hash_executor == "process":
+                # Spawned workers: the server process already runs threads and
+                # pooled connections, neither of which is safe to fork
+                _hash_executor = ProcessPoolExecutor(
+                    max_workers=settings.password_hash_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.password_hash_workers,
+                    thread_name_prefix="password-hash",
+                )
+        return _hash_executor
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """Hash a password in the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_password_and_rehash_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """``verify_password_and_rehash`` in the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), verify_password_and_rehash, plain_password, hashed_password
+    )
+
+
+def shutdown_hash_executor() -> None:
+    """Stop the password hashing pool; it is recreated on next use."""
+    global _hash_executor
+
+    with _hash_executor_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def _create_token(subject: str, role: str, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     payload = {"sub": subject, "role": role, "exp": expire}
@@ -33,11 +129,27 @@ def create_refresh_token(subject: str, role: str) -> str:
 
 
 def decode_token(token: str) -> TokenPayload:
+    """Verify a token and return its payload.
+
+    Verified payloads are cached until they expire, so repeat callers skip
+    signature verification and model validation. Invalid tokens are never cached.
+    """
+    cached = _token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload: dict[str, Any] = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        return TokenPayload(**payload)
+        token_payload = TokenPayload(**payload)
     except ExpiredSignatureError as exc:
         raise ValueError("Token has expired") from exc
     except JWTError as exc:
         raise ValueError("Invalid token") from exc
 
+    _token_cache.set(token, token_payload, expires_at=token_payload.exp)
+    return token_payload
+
+
+def get_token_cache_stats() -> dict:
+    return _token_cache.stats()
+
@@ -1,7 +1,23 @@
 """Database package."""
 
-from .init import initialize_database
-from .session import db_session, get_connection
-
-__all__ = ["initialize_database", "db_session", "get_connection"]
+from .async_session import close_async_reader, get_async_reader_stats, run_read
+from .init import initialize_database, migrate_database, seed_database, verify_schema_version
+from .migrations import SCHEMA_VERSION, SchemaVersionError
+from .session import close_pool, db_session, get_connection, get_pool_stats, transaction
 
+__all__ = [
+    "initialize_database",
+    "migrate_database",
+    "seed_database",
+    "verify_schema_version",
+    "SCHEMA_VERSION",
+    "SchemaVersionError",
+    "db_session",
+    "get_connection",
+    "get_pool_stats",
+    "close_pool",
+    "transaction",
+    "run_read",
+    "get_async_reader_stats",
+    "close_async_reader",
+]
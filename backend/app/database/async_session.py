@@ -0,0 +1,153 @@
+"""Async read access for endpoints running on the event loop.
+
+``run_read(fn, *args)`` queues ``fn(conn, *args)`` for a small set of
+dedicated reader threads, each owning one read-only connection, and awaits
+the result. Async endpoints use it instead of ``db_session`` in the request
+threadpool, so read traffic is bounded by the readers rather than by the
+threadpool, and a waiting request costs a future instead of a thread.
+"""
+
+import asyncio
+from collections.abc import Callable
+import os
+import queue
+import sqlite3
+import threading
+from typing import Any, TypeVar
+
+from ..config import settings
+from .session import get_connection
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, result: Any, exc: BaseException | None) -> None:
+    if future.cancelled():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+
+class AsyncReader:
+    """Reader threads that run queries for the event loop.
+
+    Jobs wait in one queue; each thread takes the next job and runs it on its
+    own read-only connection (``PRAGMA query_only``), reopening the connection
+    after a database error.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stats = {"queries": 0, "errors": 0, "reconnects": 0}
+
+    def _ensure_started(self) -> None:
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads do not survive a fork (e.g. uvicorn workers)
+                self._jobs = queue.SimpleQueue()
+                self._threads = []
+                self._pid = os.getpid()
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"db-reader-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self) -> None:
+        conn: sqlite3.Connection | None = None
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                break
+            fn, args, future, loop = job
+            result, error = None, None
+            try:
+                if conn is None:
+                    conn = get_connection(read_only=True)
+                result = fn(conn, *args)
+            except BaseException as exc:
+                error = exc
+                if isinstance(exc, sqlite3.Error) and conn is not None:
+                    conn.close()
+                    conn = None
+                    with self._lock:
+                        self._stats["reconnects"] += 1
+            with self._lock:
+                self._stats["queries"] += 1
+                if error is not None:
+                    self._stats["errors"] += 1
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # Event loop already closed; nobody is waiting
+                pass
+        if conn is not None:
+            conn.close()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on a reader thread and return its result."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._jobs.put((fn, args, future, loop))
+        return await future
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            running = len(self._threads)
+        stats.update({"workers": self.workers, "running": running, "queued": self._jobs.qsize()})
+        return stats
+
+
+_reader: AsyncReader | None = None
+_reader_lock = threading.Lock()
+
+
+def get_async_reader() -> AsyncReader:
+    global _reader
+
+    reader = _reader
+    if reader is None:
+        with _reader_lock:
+            if _reader is None:
+                _reader = AsyncReader(settings.db_async_readers)
+            reader = _reader
+    return reader
+
+
+async def run_read(fn: Callable[..., T], *args: Any) -> T:
+    """Run ``fn(conn, *args)`` with a read-only connection without blocking the event loop."""
+    return await get_async_reader().run(fn, *args)
+
+
+def get_async_reader_stats() -> dict:
+    return get_async_reader().stats()
+
+
+def close_async_reader() -> None:
+    global _reader
+
+    with _reader_lock:
+        reader, _reader = _reader, None
+    if reader is not None:
+        reader.close()
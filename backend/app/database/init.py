@@ -3,7 +3,7 @@
 from sqlite3 import IntegrityError
 
 from ..core.security import hash_password
-from .migrations import run_all_migrations
+from .migrations import SCHEMA_VERSION, SchemaVersionError, get_schema_version, run_all_migrations
 from .session import db_session
 
 
@@ -304,18 +304,43 @@ def _migrate_users_table(cursor) -> None:
         pass
 
 
-def initialize_database() -> None:
-    with db_session() as conn:
-        cursor = conn.cursor()
-        for statement in CREATE_STATEMENTS:
-            cursor.execute(statement)
-        
-        # Run migration to add missing columns to existing tables
-        _migrate_users_table(cursor)
+def migrate_database() -> int:
+    """Create the base schema if needed and apply pending migrations.
+
+    Returns the schema version afterwards.
+    """
+    schema_version = get_schema_version()
+
+    # Base schema for new and pre-versioning databases; later schema
+    # changes go through MIGRATIONS.
+    if schema_version == 0:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            for statement in CREATE_STATEMENTS:
+                cursor.execute(statement)
+            
+            # Run migration to add missing columns to existing tables
+            _migrate_users_table(cursor)
 
     # Run migrations to add new fields
-    run_all_migrations()
+    if schema_version < SCHEMA_VERSION:
+        run_all_migrations()
 
+    return get_schema_version()
+
+
+def verify_schema_version() -> None:
+    """Fail fast if the database has not been migrated to SCHEMA_VERSION."""
+    schema_version = get_schema_version()
+    if schema_version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {schema_version}, expected {SCHEMA_VERSION}. "
+            "Run `python -m app.cli migrate` before starting the API."
+        )
+
+
+def seed_database() -> None:
+    """Insert the default admin, demo user and sample catalog if missing."""
     with db_session() as conn:
         cursor = conn.cursor()
         # Create default admin if not exists
@@ -492,3 +517,8 @@ def initialize_database() -> None:
                 sample_events,
             )
 
+
+def initialize_database() -> None:
+    """Migrate and seed in one step, for scripts, benchmarks and local setups."""
+    migrate_database()
+    seed_database()
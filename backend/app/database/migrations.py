@@ -1,7 +1,14 @@
 """Database migration utilities for schema updates."""
 
+import logging
+import sqlite3
+import time
+
+from ..config import MAX_REFERRAL_DEPTH
 from .session import db_session
 
+logger = logging.getLogger(__name__)
+
 
 def migrate_add_missing_user_columns() -> None:
     """Add missing columns to users table that might not exist in old databases."""
@@ -456,14 +463,511 @@ def migrate_add_community_features() -> None:
         conn.commit()
 
 
+def migrate_add_user_ancestors() -> None:
+    """Create the referral closure table and backfill it from users.referrer_id.
+
+    Each row links a user to one of its uplines at the given depth (1 = direct
+    referrer). The backfill only runs while the table is still empty.
+    """
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_ancestors (
+                ancestor_id INTEGER NOT NULL,
+                descendant_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                PRIMARY KEY (ancestor_id, descendant_id),
+                FOREIGN KEY (ancestor_id) REFERENCES users(id),
+                FOREIGN KEY (descendant_id) REFERENCES users(id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_ancestors_descendant_depth
+            ON user_ancestors(descendant_id, depth)
+        """)
+
+        if cursor.execute("SELECT 1 FROM user_ancestors LIMIT 1").fetchone():
+            conn.commit()
+            return
+
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO user_ancestors (ancestor_id, descendant_id, depth)
+            WITH RECURSIVE upline(descendant_id, ancestor_id, depth) AS (
+                SELECT id, referrer_id, 1
+                FROM users
+                WHERE referrer_id IS NOT NULL AND referrer_id != id
+                UNION ALL
+                SELECT upline.descendant_id, u.referrer_id, upline.depth + 1
+                FROM upline
+                JOIN users u ON u.id = upline.ancestor_id
+                WHERE u.referrer_id IS NOT NULL
+                  AND u.referrer_id != upline.descendant_id
+                  AND upline.depth < ?
+            )
+            SELECT ancestor_id, descendant_id, depth
+            FROM upline
+            """,
+            (MAX_REFERRAL_DEPTH,),
+        )
+        conn.commit()
+
+
+def migrate_add_compensation_outbox() -> None:
+    """Create the outbox table for asynchronous order compensation.
+
+    order_id is the idempotency key: each order is enqueued and paid out once.
+    """
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS compensation_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL UNIQUE,
+                user_id INTEGER NOT NULL,
+                package_id INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                sales_units INTEGER NOT NULL,
+                status TEXT DEFAULT 'pending', -- pending, done, failed
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                processed_at TIMESTAMP,
+                FOREIGN KEY (order_id) REFERENCES orders(id),
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_compensation_outbox_status_available
+            ON compensation_outbox(status, available_at)
+        """)
+        conn.commit()
+
+
+def migrate_add_settlement_run_ids() -> None:
+    """Tag queue items and commission transactions with their settlement run."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("ALTER TABLE team_commission_queue ADD COLUMN settlement_run_id TEXT")
+        except Exception:
+            pass  # Column might already exist
+
+        try:
+            cursor.execute("ALTER TABLE compensation_transactions ADD COLUMN settlement_run_id TEXT")
+        except Exception:
+            pass
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_compensation_transactions_run_user
+            ON compensation_transactions(settlement_run_id, user_id)
+        """)
+        conn.commit()
+
+
+def migrate_add_commission_runs() -> None:
+    """Create tables for resumable, chunked weekly settlement runs."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS commission_runs (
+                run_id TEXT PRIMARY KEY,
+                status TEXT DEFAULT 'running', -- running, completed, failed
+                max_queue_id INTEGER NOT NULL, -- queue snapshot: items with id <= max_queue_id
+                chunk_size INTEGER NOT NULL,
+                last_user_id INTEGER DEFAULT 0, -- checkpoint: users <= last_user_id are settled
+                users_processed INTEGER DEFAULT 0,
+                total_commissions REAL DEFAULT 0,
+                transactions_created INTEGER DEFAULT 0,
+                last_error TEXT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS commission_run_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                start_user_id INTEGER NOT NULL,
+                end_user_id INTEGER NOT NULL,
+                users_processed INTEGER NOT NULL,
+                total_commissions REAL NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (run_id) REFERENCES commission_runs(run_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_commission_run_chunks_run
+            ON commission_run_chunks(run_id)
+        """)
+        # Lets each chunk find its users' pending items by user_id range
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_team_commission_queue_pending_user
+            ON team_commission_queue(user_id) WHERE status = 'pending'
+        """)
+        conn.commit()
+
+
+def migrate_add_scheduler_leases() -> None:
+    """Create the lease table used to elect a single scheduler leader."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL, -- unix timestamp
+                acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                renewed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+
+def migrate_add_scheduler_job_store() -> None:
+    """Create tables for persistent scheduled jobs and their run history."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS apscheduler_jobs (
+                id TEXT PRIMARY KEY,
+                next_run_time REAL, -- unix timestamp, NULL when paused
+                job_state BLOB NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_apscheduler_jobs_next_run_time
+            ON apscheduler_jobs(next_run_time)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scheduler_job_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL, -- success, error, missed
+                scheduled_run_time TIMESTAMP,
+                finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                duration_seconds REAL,
+                error TEXT,
+                instance_id TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scheduler_job_runs_job
+            ON scheduler_job_runs(job_id, id)
+        """)
+        conn.commit()
+
+
+def migrate_add_user_compensation_summary() -> None:
+    """Create the per-user compensation summary and backfill it from history."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_compensation_summary (
+                user_id INTEGER PRIMARY KEY,
+                direct_referral_bonus REAL NOT NULL DEFAULT 0, -- approved direct_referral transactions
+                team_commission REAL NOT NULL DEFAULT 0, -- approved team_commission transactions
+                rank_bonuses REAL NOT NULL DEFAULT 0, -- approved rank_bonus transactions
+                pending_payouts REAL NOT NULL DEFAULT 0, -- pending payout transactions (negative amounts)
+                pending_weekly_commissions REAL NOT NULL DEFAULT 0, -- pending team_commission_queue items
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+
+        has_rows = cursor.execute("SELECT 1 FROM user_compensation_summary LIMIT 1").fetchone()
+        if not has_rows:
+            cursor.execute("""
+                INSERT INTO user_compensation_summary
+                    (user_id, direct_referral_bonus, team_commission, rank_bonuses,
+                     pending_payouts, pending_weekly_commissions)
+                SELECT
+                    u.id,
+                    COALESCE(t.direct_referral_bonus, 0),
+                    COALESCE(t.team_commission, 0),
+                    COALESCE(t.rank_bonuses, 0),
+                    COALESCE(t.pending_payouts, 0),
+                    COALESCE(q.pending_weekly_commissions, 0)
+                FROM users u
+                LEFT JOIN (
+                    SELECT
+                        user_id,
+                        SUM(CASE WHEN status = 'approved' AND type = 'direct_referral' THEN amount END) AS direct_referral_bonus,
+                        SUM(CASE WHEN status = 'approved' AND type = 'team_commission' THEN amount END) AS team_commission,
+                        SUM(CASE WHEN status = 'approved' AND type = 'rank_bonus' THEN amount END) AS rank_bonuses,
+                        SUM(CASE WHEN status = 'pending' AND type = 'payout' THEN amount END) AS pending_payouts
+                    FROM compensation_transactions
+                    GROUP BY user_id
+                ) t ON t.user_id = u.id
+                LEFT JOIN (
+                    SELECT user_id, SUM(commission_amount) AS pending_weekly_commissions
+                    FROM team_commission_queue
+                    WHERE status = 'pending'
+                    GROUP BY user_id
+                ) q ON q.user_id = u.id
+            """)
+        conn.commit()
+
+
+def migrate_add_compensation_transaction_history_indexes() -> None:
+    """Indexes for keyset-paginated, filtered transaction history per user."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        # id is the rowid, so each index also orders ties on created_at by id
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_compensation_transactions_user_created
+            ON compensation_transactions(user_id, created_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_compensation_transactions_user_type_created
+            ON compensation_transactions(user_id, type, created_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_compensation_transactions_user_status_created
+            ON compensation_transactions(user_id, status, created_at)
+        """)
+        conn.commit()
+
+
+# Secondary indexes for foreign-key joins and hot filters. Databases already
+# past this migration never run it again, so add further indexes in a new
+# numbered migration appended to MIGRATIONS instead of extending this tuple.
+HOT_PATH_INDEXES = (
+    ("idx_users_referrer_id", "users(referrer_id)"),
+    ("idx_orders_user_created", "orders(user_id, created_at)"),
+    ("idx_orders_created", "orders(created_at)"),
+    ("idx_book_order_items_order", "book_order_items(order_id)"),
+    ("idx_community_posts_feed", "community_posts(is_active, is_pinned, created_at)"),
+    ("idx_community_posts_active_created", "community_posts(is_active, created_at)"),
+    ("idx_community_comments_post_created", "community_comments(post_id, created_at)"),
+    ("idx_community_comments_active_created", "community_comments(is_active, created_at)"),
+    ("idx_event_registrations_event", "event_registrations(event_id)"),
+    ("idx_lessons_course_order", "lessons(course_id, order_index)"),
+    ("idx_support_tickets_user_created", "support_tickets(user_id, created_at)"),
+)
+
+
+def migrate_add_hot_path_indexes() -> None:
+    """Index foreign keys and filter columns used by request-path queries.
+
+    ``python -m app.cli check-query-plans`` fails if a query in the services
+    or community router falls back to a full table scan.
+    """
+    with db_session() as conn:
+        cursor = conn.cursor()
+        for name, definition in HOT_PATH_INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        conn.commit()
+
+
+# Rank ladder: (rank, rank_order, min_sales_units, bonus, insurance).
+# Sales units are the user's direct plus team sales.
+DEFAULT_RANK_THRESHOLDS = (
+    ("starter", 0, 0, 0, 0),
+    ("achiever", 1, 100, 10000, 0),
+    ("leader", 2, 1000, 100000, 100000),
+    ("pro_leader", 3, 10000, 1000000, 1000000),
+    ("champion", 4, 100000, 10000000, 10000000),
+    ("legend", 5, 1000000, 100000000, 100000000),
+)
+
+
+def migrate_add_rank_thresholds() -> None:
+    """Create the sorted rank threshold table used by the rank engine."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rank_thresholds (
+                rank TEXT PRIMARY KEY,
+                rank_order INTEGER NOT NULL UNIQUE,
+                min_sales_units INTEGER NOT NULL,
+                bonus REAL NOT NULL DEFAULT 0,
+                insurance REAL NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO rank_thresholds (rank, rank_order, min_sales_units, bonus, insurance)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            DEFAULT_RANK_THRESHOLDS,
+        )
+        conn.commit()
+
+
+def migrate_add_rank_recompute_runs() -> None:
+    """Create the checkpoint table for background full-network rank recomputation."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rank_recompute_runs (
+                run_id TEXT PRIMARY KEY,
+                status TEXT DEFAULT 'running', -- running, completed, failed
+                chunk_size INTEGER NOT NULL,
+                last_user_id INTEGER DEFAULT 0, -- checkpoint: users <= last_user_id are done
+                users_scanned INTEGER DEFAULT 0,
+                promotions INTEGER DEFAULT 0,
+                demotions INTEGER DEFAULT 0,
+                skipped INTEGER DEFAULT 0,
+                bonus_total REAL DEFAULT 0,
+                last_error TEXT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+
+def migrate_add_rank_bonuses_paid() -> None:
+    """Record which rank awards each user has been paid, so re-crossing a rank pays nothing.
+
+    Backfilled from existing rank bonus transactions and insurance benefits.
+    """
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rank_bonuses_paid (
+                user_id INTEGER NOT NULL,
+                rank TEXT NOT NULL,
+                paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, rank),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO rank_bonuses_paid (user_id, rank, paid_at)
+            SELECT user_id, substr(description, length('Rank advancement bonus - ') + 1), MIN(created_at)
+            FROM compensation_transactions
+            WHERE type = 'rank_bonus' AND description LIKE 'Rank advancement bonus - %'
+            GROUP BY user_id, description
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO rank_bonuses_paid (user_id, rank, paid_at)
+            SELECT user_id, rank, MIN(assigned_at)
+            FROM insurance_benefits
+            GROUP BY user_id, rank
+        """)
+        conn.commit()
+
+
+def migrate_recount_team_sizes() -> None:
+    """Recount users.team_size as the whole downline from user_ancestors.
+
+    team_size used to be bumped for the direct referrer only; create_user now
+    counts each new member for every upline.
+    """
+    with db_session() as conn:
+        conn.execute("""
+            UPDATE users
+            SET team_size = (
+                SELECT COUNT(*) FROM user_ancestors WHERE ancestor_id = users.id
+            )
+        """)
+        conn.commit()
+
+
+def migrate_add_support_ticket_indexes() -> None:
+    """Indexes for the admin ticket listing (all or by status) and ticket statistics."""
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_support_tickets_created
+            ON support_tickets(created_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_support_tickets_status_created
+            ON support_tickets(status, created_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_support_tickets_priority
+            ON support_tickets(priority)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_support_tickets_resolved_created
+            ON support_tickets(resolved_at, created_at)
+        """)
+        conn.commit()
+
+
+# Ordered schema migrations. Versions are permanent: append new migrations
+# with the next number and never renumber or remove applied ones.
+MIGRATIONS = (
+    (1, migrate_add_missing_user_columns),
+    (2, migrate_add_sales_tracking),
+    (3, migrate_add_team_commission_queue),
+    (4, migrate_add_insurance_benefits),
+    (5, migrate_orders_table_schema),
+    (6, migrate_add_books_content_url),
+    (7, migrate_add_book_orders_payment_fields),
+    (8, migrate_add_community_features),
+    (9, migrate_add_user_ancestors),
+    (10, migrate_add_compensation_outbox),
+    (11, migrate_add_settlement_run_ids),
+    (12, migrate_add_commission_runs),
+    (13, migrate_add_scheduler_leases),
+    (14, migrate_add_scheduler_job_store),
+    (15, migrate_add_user_compensation_summary),
+    (16, migrate_add_compensation_transaction_history_indexes),
+    (17, migrate_add_hot_path_indexes),
+    (18, migrate_add_rank_thresholds),
+    (19, migrate_add_rank_recompute_runs),
+    (20, migrate_add_rank_bonuses_paid),
+    (21, migrate_recount_team_sizes),
+    (22, migrate_add_support_ticket_indexes),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema is older than the application expects."""
+
+
+def get_schema_version() -> int:
+    """Get the highest applied migration version (0 for a new or unversioned database)."""
+    with db_session() as conn:
+        try:
+            row = conn.execute("SELECT MAX(version) AS version FROM schema_migrations").fetchone()
+        except sqlite3.OperationalError:
+            return 0  # schema_migrations not created yet
+    return row["version"] or 0
+
+
 def run_all_migrations() -> None:
-    """Run all pending migrations."""
-    migrate_add_missing_user_columns()  # Run first to add basic columns
-    migrate_add_sales_tracking()
-    migrate_add_team_commission_queue()
-    migrate_add_insurance_benefits()
-    migrate_orders_table_schema()  # Migrate orders table schema
-    migrate_add_books_content_url()  # Add content_url to books table
-    migrate_add_book_orders_payment_fields()  # Add payment fields to book_orders
-    migrate_add_community_features()  # Add community forum tables
+    """Run all pending migrations.
+    
+    Each applied migration is recorded in ``schema_migrations``, so a database
+    at SCHEMA_VERSION costs one query. Migrations stay idempotent: databases
+    created before versioning start at 0 and replay them safely, as does a
+    worker racing another one through startup.
+    """
+    current_version = get_schema_version()
+    if current_version >= SCHEMA_VERSION:
+        return
+
+    with db_session() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
 
+    for version, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+        started = time.perf_counter()
+        migration()
+        duration_ms = (time.perf_counter() - started) * 1000
+        with db_session() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO schema_migrations (version, name, duration_ms) VALUES (?, ?, ?)",
+                (version, migration.__name__, duration_ms),
+            )
+        logger.info(f"Applied migration {version} {migration.__name__} in {duration_ms:.1f}ms")
@@ -0,0 +1,132 @@
+"""EXPLAIN QUERY PLAN checks for the application's SQL.
+
+Collects every literal SQL statement in ``app/services`` and the community
+router, asks SQLite for its query plan, and reports statements that read a
+table without any index. Used by ``python -m app.cli check-query-plans``.
+"""
+
+import ast
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+CHECKED_PATHS = (
+    APP_DIR / "services",
+    APP_DIR / "routers" / "community.py",
+)
+
+# Small reference tables (catalog, content, configuration and job bookkeeping)
+# that are read whole by design.
+FULL_SCAN_ALLOWED_TABLES = frozenset({
+    "apscheduler_jobs",
+    "books",
+    "commission_runs",
+    "community_banners",
+    "courses",
+    "events",
+    "meeting_links",
+    "packages",
+    "rank_recompute_runs",
+    "scheduler_job_runs",
+    "site_content",
+})
+
+_STATEMENT_RE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s")
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+
+@dataclass
+class SQLStatement:
+    path: Path
+    lineno: int
+    sql: str
+
+    @property
+    def location(self) -> str:
+        return f"{self.path.relative_to(APP_DIR.parent)}:{self.lineno}"
+
+
+@dataclass
+class PlanIssue:
+    statement: SQLStatement
+    detail: str
+
+    def __str__(self) -> str:
+        sql = " ".join(self.statement.sql.split())
+        return f"{self.statement.location}: {self.detail}\n    {sql[:160]}"
+
+
+def iter_sql_statements(paths=CHECKED_PATHS) -> Iterator[SQLStatement]:
+    """Yield string literals that look like SQL statements.
+
+    Dynamic fragments (f-strings and partial statements completed at runtime)
+    are skipped because they cannot be planned on their own.
+    """
+    files: List[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.py")) if path.is_dir() else [path])
+
+    for file in files:
+        tree = ast.parse(file.read_text(), filename=str(file))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and _STATEMENT_RE.match(node.value):
+                yield SQLStatement(file, node.lineno, node.value)
+
+
+def _table_names(conn: sqlite3.Connection) -> dict:
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    return {row[0].lower(): row[0] for row in rows}
+
+
+def _aliases(sql: str, tables: dict) -> dict:
+    """Map aliases used in FROM/JOIN clauses back to table names."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        if table.lower() not in tables:
+            continue
+        aliases[table.lower()] = tables[table.lower()]
+        if alias:
+            aliases[alias.lower()] = tables[table.lower()]
+    return aliases
+
+
+def check_statement(conn: sqlite3.Connection, statement: SQLStatement, tables: dict) -> List[PlanIssue] | None:
+    """Return the full-table scans in a statement's plan, or None if it cannot be planned."""
+    try:
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN {statement.sql}", [None] * statement.sql.count("?")
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+
+    aliases = _aliases(statement.sql, tables)
+    issues = []
+    for row in plan:
+        detail = row[3]
+        match = _SCAN_RE.match(detail)
+        if not match:
+            continue  # SEARCH, index scans, subqueries and CTEs
+        table = aliases.get(match.group(1).lower(), tables.get(match.group(1).lower()))
+        if table is None or table in FULL_SCAN_ALLOWED_TABLES:
+            continue
+        issues.append(PlanIssue(statement, detail))
+    return issues
+
+
+def find_full_scans(conn: sqlite3.Connection, paths=CHECKED_PATHS) -> tuple[List[PlanIssue], int, int]:
+    """Check every statement; returns (issues, statements checked, statements skipped)."""
+    tables = _table_names(conn)
+    issues: List[PlanIssue] = []
+    checked = skipped = 0
+    for statement in iter_sql_statements(paths):
+        result = check_statement(conn, statement, tables)
+        if result is None:
+            skipped += 1
+            continue
+        checked += 1
+        issues.extend(result)
+    return issues, checked, skipped
@@ -1,21 +1,302 @@
 """SQLite session management."""
 
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from contextlib import contextmanager
+from contextvars import ContextVar, Token
+import os
+import queue
 import sqlite3
+import threading
+import time
 
 from ..config import settings
 
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(settings.database_path)
+def _apply_pragmas(conn: sqlite3.Connection, read_only: bool = False) -> None:
+    """Apply the configured PRAGMA profile to a freshly opened connection."""
+    conn.execute(f"PRAGMA busy_timeout = {int(settings.db_busy_timeout_ms)}")
+    if not read_only:
+        # journal_mode is persistent in the database file; only writers need to set it.
+        conn.execute(f"PRAGMA journal_mode = {settings.db_journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {settings.db_synchronous}")
+    # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+    conn.execute(f"PRAGMA cache_size = -{abs(int(settings.db_cache_size_kib))}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings.db_mmap_size)}")
+    conn.execute(f"PRAGMA temp_store = {settings.db_temp_store}")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+
+
+def get_connection(read_only: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        settings.database_path,
+        timeout=settings.db_busy_timeout_ms / 1000,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn, read_only=read_only)
     return conn
 
 
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Up to ``size`` connections are kept open between sessions. When all of them
+    are checked out, up to ``max_overflow`` extra connections are opened and
+    closed again on release. Beyond that, callers wait up to ``timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        read_only: bool = False,
+        max_overflow: int = 0,
+        timeout: float = 30.0,
+        pre_ping_seconds: float = 30.0,
+        recycle_seconds: float = 3600.0,
+    ) -> None:
+        self.size = size
+        self.read_only = read_only
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping_seconds = pre_ping_seconds
+        self.recycle_seconds = recycle_seconds
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size + max_overflow)
+        self._opened: dict[int, float] = {}
+        self._last_used: dict[int, float] = {}
+        self._pid = os.getpid()
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def _reset_after_fork(self) -> None:
+        # Connections must never be shared across processes (e.g. uvicorn workers).
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._slots = threading.BoundedSemaphore(self.size + self.max_overflow)
+        self._opened.clear()
+        self._last_used.clear()
+        self._pid = os.getpid()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = get_connection(read_only=self.read_only)
+        now = time.monotonic()
+        with self._lock:
+            self._opened[id(conn)] = now
+            self._last_used[id(conn)] = now
+            self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened.pop(id(conn), None)
+            self._last_used.pop(id(conn), None)
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        now = time.monotonic()
+        opened = self._opened.get(id(conn), now)
+        if self.recycle_seconds and now - opened > self.recycle_seconds:
+            return False
+        last_used = self._last_used.get(id(conn), now)
+        if now - last_used < self.pre_ping_seconds:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def acquire(self) -> sqlite3.Connection:
+        if os.getpid() != self._pid:
+            self._reset_after_fork()
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"No database connection available within {self.timeout} seconds"
+                )
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open()
+                    break
+                if self._is_healthy(candidate):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self._last_used[id(conn)] = time.monotonic()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            # Overflow connection or broken connection: close instead of pooling.
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            open_connections = len(self._opened)
+            stats = dict(self._stats)
+        idle = self._idle.qsize()
+        stats.update(
+            {
+                "read_only": self.read_only,
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": open_connections,
+                "idle": idle,
+                "in_use": open_connections - idle,
+            }
+        )
+        return stats
+
+
+_pools: dict[bool, ConnectionPool] = {}
+_pool_lock = threading.Lock()
+
+
+def get_pool(read_only: bool = False) -> ConnectionPool:
+    pool = _pools.get(read_only)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(read_only)
+            if pool is None:
+                pool = ConnectionPool(
+                    size=settings.db_pool_size,
+                    read_only=read_only,
+                    max_overflow=settings.db_pool_max_overflow,
+                    timeout=settings.db_pool_timeout,
+                    pre_ping_seconds=settings.db_pool_pre_ping_seconds,
+                    recycle_seconds=settings.db_pool_recycle_seconds,
+                )
+                _pools[read_only] = pool
+    return pool
+
+
+def get_pool_stats() -> dict:
+    return {
+        "read_write": get_pool().stats(),
+        "read_only": get_pool(read_only=True).stats(),
+    }
+
+
+def close_pool() -> None:
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
+
+
+_active_connection: ContextVar[sqlite3.Connection | None] = ContextVar("active_db_connection", default=None)
+
+
+def get_active_connection() -> sqlite3.Connection | None:
+    """Return the connection of the enclosing unit of work, if any."""
+    return _active_connection.get()
+
+
+# Callbacks to run once the unit of work on a connection commits, keyed by id(conn)
+_after_commit: dict[int, list[Callable[[], None]]] = {}
+_after_commit_lock = threading.Lock()
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """Run ``callback`` after the enclosing unit of work commits.
+
+    Inside a ``transaction()`` (or a request using ``get_db_session``) the
+    callback is deferred until the outer commit and dropped on rollback.
+    Otherwise there is nothing pending, so it runs immediately; call it after
+    the ``db_session()`` block whose writes it signals.
+    """
+    conn = _active_connection.get()
+    if conn is None:
+        callback()
+        return
+    with _after_commit_lock:
+        _after_commit.setdefault(id(conn), []).append(callback)
+
+
+def pop_commit_callbacks(conn: sqlite3.Connection) -> list[Callable[[], None]]:
+    """Take the callbacks registered for ``conn``'s unit of work (call before releasing it)."""
+    with _after_commit_lock:
+        return _after_commit.pop(id(conn), [])
+
+
+def run_commit_callbacks(callbacks: list[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        callback()
+
+
+def bind_connection(conn: sqlite3.Connection | None) -> Token:
+    return _active_connection.set(conn)
+
+
+def unbind_connection(token: Token) -> None:
+    try:
+        _active_connection.reset(token)
+    except ValueError:
+        # Token was created in another context (e.g. an async dependency); clear instead.
+        _active_connection.set(None)
+
+
 @contextmanager
-def db_session() -> Generator[sqlite3.Connection, None, None]:
-    conn = get_connection()
+def transaction() -> Generator[sqlite3.Connection, None, None]:
+    """Run a unit of work on a single connection.
+
+    Every ``db_session()`` opened inside the block (in this thread or in any
+    context copied from it) joins the same connection, and everything is
+    committed or rolled back together when the block exits.
+    """
+    active = _active_connection.get()
+    if active is not None:
+        yield active
+        return
+
+    pool = get_pool()
+    conn = pool.acquire()
+    token = bind_connection(conn)
     try:
         yield conn
         conn.commit()
@@ -23,5 +304,34 @@ def db_session() -> Generator[sqlite3.Connection, None, None]:
         conn.rollback()
         raise
     finally:
-        conn.close()
+        callbacks = pop_commit_callbacks(conn)
+        unbind_connection(token)
+        pool.release(conn)
+    # Only reached after a successful commit
+    run_commit_callbacks(callbacks)
+
+
+@contextmanager
+def db_session(read_only: bool = False) -> Generator[sqlite3.Connection, None, None]:
+    """Yield a pooled connection, committing on success and rolling back on error.
+
+    ``read_only`` sessions use a separate pool whose connections run with
+    ``PRAGMA query_only``, so they can never take the write lock. Inside a
+    ``transaction()`` (or a request using ``get_db_session``) the enclosing
+    connection is reused and the outer block owns commit and rollback.
+    """
+    active = _active_connection.get()
+    if active is not None:
+        yield active
+        return
 
+    pool = get_pool(read_only=read_only)
+    conn = pool.acquire()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
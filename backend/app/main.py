@@ -4,7 +4,6 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .database import initialize_database
 from .routers.admin import router as admin_router
 from .routers.auth import router as auth_router
 from .routers.books import router as books_router
@@ -25,14 +24,13 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    initialize_database()
-
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
     app.include_router(books_router, prefix="/api/books", tags=["books"])
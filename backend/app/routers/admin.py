@@ -1,9 +1,14 @@
 """Admin-specific endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ..config import settings
 from ..core.dependencies import get_current_admin
-from ..core.security import create_access_token, create_refresh_token
+from ..core.security import create_access_token, create_refresh_token, get_token_cache_stats
+from ..database.async_session import get_async_reader_stats
+from ..database.session import get_pool_stats
 from ..models.schemas import (
     AdminCredentials,
     Book,
@@ -16,14 +21,23 @@ from ..models.schemas import (
 from ..services import admin as admin_service
 from ..services.books import create_book, delete_book, get_book, list_books, update_book
 from ..services.orders import get_order_detail, list_all_orders
+from ..services.outbox import get_compensation_outbox_stats
+from ..services.ranks import (
+    get_rank_recompute_run,
+    recompute_all_ranks,
+    resume_rank_recompute_run,
+    start_rank_recompute_run,
+)
+from ..services.scheduler import get_scheduler_status, submit_background_job
+from ..services.users import get_user_cache_stats
 
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=TokenPair)
-def admin_login(payload: AdminCredentials) -> TokenPair:
-    username = admin_service.authenticate_admin(payload)
+async def admin_login(payload: AdminCredentials) -> TokenPair:
+    username = await admin_service.authenticate_admin(payload)
     return TokenPair(
         access_token=create_access_token(username, "admin"),
         refresh_token=create_refresh_token(username, "admin"),
@@ -59,3 +73,91 @@ def admin_orders(_: str = Depends(get_current_admin)) -> list[OrderSummary]:
 def admin_order_detail(order_id: int, _: str = Depends(get_current_admin)) -> OrderDetail:
     return get_order_detail(order_id)
 
+
+@router.get("/system/db-pool")
+def admin_db_pool_stats(_: str = Depends(get_current_admin)) -> dict:
+    """Get connection pool and async reader statistics for this worker."""
+    return {**get_pool_stats(), "async_readers": get_async_reader_stats()}
+
+
+@router.get("/system/compensation-outbox")
+def admin_compensation_outbox_stats(_: str = Depends(get_current_admin)) -> dict:
+    """Get compensation outbox event counts by status."""
+    return get_compensation_outbox_stats()
+
+
+@router.get("/system/caches")
+def admin_cache_stats(_: str = Depends(get_current_admin)) -> dict:
+    """Get hit rates and sizes of this worker's in-process caches."""
+    return {"users": get_user_cache_stats(), "tokens": get_token_cache_stats()}
+
+
+@router.get("/system/scheduler")
+def admin_scheduler_status(_: str = Depends(get_current_admin)) -> dict:
+    """Get the scheduler leader and persistent jobs with next/last run times and durations."""
+    return get_scheduler_status()
+
+
+@router.post("/ranks/recompute")
+def admin_recompute_ranks(
+    dry_run: bool = True,
+    chunk_size: Optional[int] = Query(None, ge=1, le=100000),
+    start_after_user_id: int = Query(0, ge=0),
+    max_chunks: Optional[int] = Query(None, ge=1),
+    _: str = Depends(get_current_admin),
+) -> dict:
+    """Report rank differences (dry_run, the default) or start a background recompute run.
+    
+    A dry run returns its report directly. It scans at most max_chunks chunks
+    (default ``RANK_RECOMPUTE_DRY_RUN_MAX_CHUNKS``); while ``completed`` is
+    false, pass the returned last_user_id as start_after_user_id to continue.
+    Otherwise a run is started and applied chunk by chunk on the scheduler's
+    executor; poll ``GET /ranks/recompute/{run_id}`` for its progress.
+    """
+    if dry_run:
+        return recompute_all_ranks(
+            dry_run=True,
+            chunk_size=chunk_size,
+            start_after_user_id=start_after_user_id,
+            max_chunks=max_chunks or settings.rank_recompute_dry_run_max_chunks,
+        )
+
+    try:
+        run_id = start_rank_recompute_run(chunk_size=chunk_size, start_after_user_id=start_after_user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return _submit_rank_recompute(run_id, max_chunks)
+
+
+@router.get("/ranks/recompute/{run_id}")
+def admin_rank_recompute_run(run_id: str, _: str = Depends(get_current_admin)) -> dict:
+    """Get a rank recompute run with its checkpoint and totals."""
+    run = get_rank_recompute_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rank recompute run not found")
+    return run
+
+
+@router.post("/ranks/recompute/{run_id}/resume")
+def admin_resume_rank_recompute(
+    run_id: str,
+    max_chunks: Optional[int] = Query(None, ge=1),
+    _: str = Depends(get_current_admin),
+) -> dict:
+    """Continue an interrupted or failed rank recompute run in the background."""
+    run = get_rank_recompute_run(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rank recompute run not found")
+    if run["status"] == "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rank recompute run already completed")
+    return _submit_rank_recompute(run_id, max_chunks)
+
+
+def _submit_rank_recompute(run_id: str, max_chunks: Optional[int]) -> dict:
+    try:
+        job_id = submit_background_job(
+            resume_rank_recompute_run, run_id, max_chunks, name=f"Rank recompute {run_id}"
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return {"run_id": run_id, "job_id": job_id, "run": get_rank_recompute_run(run_id)}
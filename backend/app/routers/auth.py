@@ -1,9 +1,11 @@
 """Authentication endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from ..core.dependencies import get_current_user
-from ..core.security import create_access_token, create_refresh_token, decode_token
+from ..core.security import create_access_token, create_refresh_token, decode_token, hash_password_async
+from ..database.session import transaction
 from ..models.schemas import (
     AuthCredentials,
     AuthResponse,
@@ -29,15 +31,22 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserProfile, status_code=201)
-def register_user(payload: UserCreate) -> UserProfile:
-    user = create_user(payload)
-    return get_user_profile_by_id(user.id)
+async def register_user(payload: UserCreate) -> UserProfile:
+    # Hash before taking a connection so slow hashing never holds one open
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_register_user, payload, password_hash)
+
+
+def _register_user(payload: UserCreate, password_hash: str) -> UserProfile:
+    with transaction():
+        user = create_user(payload, password_hash)
+        return get_user_profile_by_id(user.id)
 
 
 @router.post("/login", response_model=AuthResponse)
-def login_user(payload: AuthCredentials) -> AuthResponse:
-    user = authenticate_user(payload)
-    profile = get_user_profile_by_id(user.id)
+async def login_user(payload: AuthCredentials) -> AuthResponse:
+    user = await authenticate_user(payload)
+    profile = await run_in_threadpool(get_user_profile_by_id, user.id)
     tokens = TokenPair(
         access_token=create_access_token(str(user.id), "user"),
         refresh_token=create_refresh_token(str(user.id), "user"),
@@ -1,25 +1,32 @@
 """Public book endpoints."""
 
-from fastapi import APIRouter
+import sqlite3
+
+from fastapi import APIRouter, HTTPException, status
 
 from ..models.schemas import Book
-from ..services.books import get_book, get_similar_books, list_books
+from ..services.books import get_book_async, get_similar_books_async, list_books_async
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[Book])
-def get_books() -> list[Book]:
-    return list_books()
+async def get_books() -> list[Book]:
+    try:
+        return await list_books_async()
+    except sqlite3.Error as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Books are temporarily unavailable"
+        ) from exc
 
 
 @router.get("/{book_id}", response_model=Book)
-def get_book_detail(book_id: int) -> Book:
-    return get_book(book_id)
+async def get_book_detail(book_id: int) -> Book:
+    return await get_book_async(book_id)
 
 
 @router.get("/{book_id}/similar", response_model=list[Book])
-def get_similar_books_endpoint(book_id: int) -> list[Book]:
-    return get_similar_books(book_id)
+async def get_similar_books_endpoint(book_id: int) -> list[Book]:
+    return await get_similar_books_async(book_id)
 
@@ -1,15 +1,18 @@
 """Compensation and earnings endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import sqlite3
+from datetime import datetime
+from typing import Optional
 
-from ..core.dependencies import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from ..core.dependencies import get_current_user, get_db_session
 from ..models.schemas import CompensationSummary, CompensationTransaction, UserPublic
 from ..services.compensation import (
     get_compensation_summary,
-    get_user_transactions,
+    get_user_transactions_page,
     process_payout_request,
 )
-from ..services.weekly_commissions import get_user_pending_commission
 
 router = APIRouter()
 
@@ -17,30 +20,47 @@ router = APIRouter()
 @router.get("/summary", response_model=CompensationSummary)
 def get_my_compensation_summary(current_user: UserPublic = Depends(get_current_user)) -> CompensationSummary:
     """Get comprehensive compensation summary for current user."""
-    summary = get_compensation_summary(current_user.id)
-    
-    # Add pending weekly commissions
-    pending_commissions = get_user_pending_commission(current_user.id)
-    
-    # Convert to dict, add pending_weekly_commissions, and return
-    summary_dict = summary.dict()
-    summary_dict["pending_weekly_commissions"] = pending_commissions
-    
-    return CompensationSummary(**summary_dict)
+    return get_compensation_summary(current_user.id)
 
 
 @router.get("/transactions", response_model=list[CompensationTransaction])
 def get_my_transactions(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     current_user: UserPublic = Depends(get_current_user)
 ) -> list[CompensationTransaction]:
-    """Get compensation transactions for current user."""
-    return get_user_transactions(current_user.id, limit)
+    """Get compensation transactions for current user, newest first.
+    
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page; the header is absent on the last page.
+    """
+    try:
+        transactions, next_cursor = get_user_transactions_page(
+            current_user.id,
+            limit,
+            cursor=cursor,
+            transaction_type=type,
+            status=status_filter,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
 
 
 @router.post("/payout", response_model=CompensationTransaction)
 def request_payout(
     amount: float,
+    _db: sqlite3.Connection = Depends(get_db_session),
     current_user: UserPublic = Depends(get_current_user)
 ) -> CompensationTransaction:
     """Request a payout from wallet balance."""
@@ -1,6 +1,7 @@
 import json
 from fastapi import APIRouter, Depends, HTTPException, status
 from ..core.dependencies import get_current_admin
+from ..database.async_session import run_read
 from ..database.session import db_session
 from ..models.schemas import ContentUpdate, HomepageContent
 
@@ -22,33 +23,33 @@ DEFAULT_HOMEPAGE_CONTENT = {
     "success_stories_subtitle": "Hear from our community members who transformed their lives through knowledge and entrepreneurship"
 }
 
+def _select_content(conn, section_key: str):
+    return conn.execute(
+        "SELECT content FROM site_content WHERE section_key = ?", (section_key,)
+    ).fetchone()
+
 @router.get("/{section_key}")
-def get_content(section_key: str):
-    with db_session() as conn:
-        cursor = conn.cursor()
-        
-        row = cursor.execute(
-            "SELECT content FROM site_content WHERE section_key = ?", (section_key,)
-        ).fetchone()
-        
-        if not row:
-            raise HTTPException(status_code=404, detail="Content not found")
-            
-        # If row is a tuple, it's row[0]. If it's a Row object, row['content'] works.
-        try:
-            content_str = row['content']
-        except (TypeError, IndexError):
-            content_str = row[0]
-        
-        content = json.loads(content_str)
-        
-        # Merge default values for homepage content if section is homepage
-        if section_key == "homepage":
-            # Merge defaults with existing content (existing content takes precedence)
-            merged_content = {**DEFAULT_HOMEPAGE_CONTENT, **content}
-            return merged_content
-            
-        return content
+async def get_content(section_key: str):
+    row = await run_read(_select_content, section_key)
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    # If row is a tuple, it's row[0]. If it's a Row object, row['content'] works.
+    try:
+        content_str = row['content']
+    except (TypeError, IndexError):
+        content_str = row[0]
+
+    content = json.loads(content_str)
+
+    # Merge default values for homepage content if section is homepage
+    if section_key == "homepage":
+        # Merge defaults with existing content (existing content takes precedence)
+        merged_content = {**DEFAULT_HOMEPAGE_CONTENT, **content}
+        return merged_content
+
+    return content
 
 @router.put("/{section_key}")
 def update_content(section_key: str, payload: ContentUpdate, admin_id: str = Depends(get_current_admin)):
@@ -1,8 +1,10 @@
 """Order endpoints."""
 
+import sqlite3
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from ..core.dependencies import get_current_user, get_optional_user
+from ..core.dependencies import get_current_user, get_db_session, get_optional_user
 from ..models.schemas import BookOrderCreate, BookOrderDetail, OrderCreate, OrderDetail, OrderSummary, UserPublic
 from ..services.book_orders import create_book_order, get_book_order_detail
 from ..services.orders import create_package_order, get_order_detail, list_user_orders, update_order_status
@@ -12,12 +14,16 @@ router = APIRouter()
 
 
 @router.post("/", response_model=OrderDetail, status_code=201)
-def place_order(payload: OrderCreate, current_user: UserPublic = Depends(get_current_user)) -> OrderDetail:
+def place_order(
+    payload: OrderCreate,
+    _db: sqlite3.Connection = Depends(get_db_session),
+    current_user: UserPublic = Depends(get_current_user),
+) -> OrderDetail:
     return create_package_order(current_user.id, payload)
 
 
 @router.post("/books", response_model=BookOrderDetail, status_code=201)
-def place_book_order(payload: BookOrderCreate) -> BookOrderDetail:
+def place_book_order(payload: BookOrderCreate, _db: sqlite3.Connection = Depends(get_db_session)) -> BookOrderDetail:
     """Create a book order (no authentication required for guest checkout)."""
     return create_book_order(payload)
 
@@ -3,22 +3,22 @@
 from fastapi import APIRouter, HTTPException, status
 
 from ..models.schemas import Package
-from ..services.packages import get_package, list_packages
+from ..services.packages import get_package_async, list_packages_async
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[Package])
-def get_packages(active_only: bool = True) -> list[Package]:
+async def get_packages(active_only: bool = True) -> list[Package]:
     """Get all active packages."""
-    return list_packages(active_only=active_only)
+    return await list_packages_async(active_only=active_only)
 
 
 @router.get("/{package_id}", response_model=Package)
-def get_package_detail(package_id: int) -> Package:
+async def get_package_detail(package_id: int) -> Package:
     """Get package details by ID."""
-    package = get_package(package_id)
+    package = await get_package_async(package_id)
     if not package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,18 +1,22 @@
 """Admin authentication helpers."""
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
-from ..core.security import verify_password
 from ..database.session import db_session
 from ..models.schemas import AdminCredentials
+from .passwords import check_login_password
 
 
-def authenticate_admin(credentials: AdminCredentials) -> str:
+def _get_admin_row(username: str):
     with db_session() as conn:
-        row = conn.execute("SELECT * FROM admins WHERE username = ?", (credentials.username,)).fetchone()
+        return conn.execute("SELECT * FROM admins WHERE username = ?", (username,)).fetchone()
 
-    if not row or not verify_password(credentials.password, row["password_hash"]):
+
+async def authenticate_admin(credentials: AdminCredentials) -> str:
+    """Check admin credentials, upgrading the stored hash to the current hashing policy."""
+    row = await run_in_threadpool(_get_admin_row, credentials.username)
+    if not row or not await check_login_password("admins", row, credentials.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     return row["username"]
-
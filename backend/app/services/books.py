@@ -2,13 +2,18 @@
 
 from collections.abc import Sequence
 from datetime import datetime
+import logging
+import sqlite3
 from sqlite3 import Row
 
 from fastapi import HTTPException, status
 
+from ..database.async_session import run_read
 from ..database.session import db_session
 from ..models.schemas import Book, BookCreate, BookUpdate
 
+logger = logging.getLogger(__name__)
+
 
 def _book_from_row(row: Row) -> Book:
     created_at = row["created_at"]
@@ -51,10 +56,56 @@ def _book_from_row(row: Row) -> Book:
     )
 
 
+def _select_books(conn) -> list[Row]:
+    return conn.execute("SELECT * FROM books ORDER BY created_at DESC").fetchall()
+
+
+def _select_book(conn, book_id: int) -> Row | None:
+    return conn.execute("SELECT * FROM books WHERE id = ?", (book_id,)).fetchone()
+
+
+def _select_similar_books(conn, book_id: int, limit: int) -> list[Row]:
+    # First get the current book to find its category and author
+    current_book_row = conn.execute(
+        "SELECT category, author FROM books WHERE id = ?",
+        (book_id,)
+    ).fetchone()
+
+    if not current_book_row:
+        return []
+
+    category = current_book_row["category"]
+    author = current_book_row["author"]
+
+    # Get similar books by category first, then by author
+    return conn.execute(
+        """
+        SELECT * FROM books 
+        WHERE id != ? 
+        AND is_active = 1
+        AND (
+            (category = ? AND category IS NOT NULL AND category != '')
+            OR (author = ? AND author IS NOT NULL AND author != '')
+        )
+        ORDER BY 
+            CASE WHEN category = ? THEN 1 ELSE 2 END,
+            created_at DESC
+        LIMIT ?
+        """,
+        (book_id, category, author, category, limit)
+    ).fetchall()
+
+
+def _book_or_404(row: Row | None) -> Book:
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+    return _book_from_row(row)
+
+
 def list_books() -> list[Book]:
     try:
-        with db_session() as conn:
-            rows = conn.execute("SELECT * FROM books ORDER BY created_at DESC").fetchall()
+        with db_session(read_only=True) as conn:
+            rows = _select_books(conn)
         return [_book_from_row(row) for row in rows]
     except Exception as e:
         # Log error and return empty list instead of crashing
@@ -62,48 +113,35 @@ def list_books() -> list[Book]:
         return []
 
 
+async def list_books_async() -> list[Book]:
+    try:
+        rows = await run_read(_select_books)
+    except sqlite3.Error:
+        logger.exception("Error fetching books")
+        raise
+    return [_book_from_row(row) for row in rows]
+
+
 def get_book(book_id: int) -> Book:
-    with db_session() as conn:
-        row = conn.execute("SELECT * FROM books WHERE id = ?", (book_id,)).fetchone()
-    if not row:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
-    return _book_from_row(row)
+    with db_session(read_only=True) as conn:
+        row = _select_book(conn, book_id)
+    return _book_or_404(row)
+
+
+async def get_book_async(book_id: int) -> Book:
+    return _book_or_404(await run_read(_select_book, book_id))
 
 
 def get_similar_books(book_id: int, limit: int = 4) -> list[Book]:
     """Get similar books by category or author, excluding the current book."""
-    with db_session() as conn:
-        # First get the current book to find its category and author
-        current_book_row = conn.execute(
-            "SELECT category, author FROM books WHERE id = ?",
-            (book_id,)
-        ).fetchone()
-        
-        if not current_book_row:
-            return []
-        
-        category = current_book_row["category"]
-        author = current_book_row["author"]
-        
-        # Get similar books by category first, then by author
-        rows = conn.execute(
-            """
-            SELECT * FROM books 
-            WHERE id != ? 
-            AND is_active = 1
-            AND (
-                (category = ? AND category IS NOT NULL AND category != '')
-                OR (author = ? AND author IS NOT NULL AND author != '')
-            )
-            ORDER BY 
-                CASE WHEN category = ? THEN 1 ELSE 2 END,
-                created_at DESC
-            LIMIT ?
-            """,
-            (book_id, category, author, category, limit)
-        ).fetchall()
-        
-        return [_book_from_row(row) for row in rows]
+    with db_session(read_only=True) as conn:
+        rows = _select_similar_books(conn, book_id, limit)
+    return [_book_from_row(row) for row in rows]
+
+
+async def get_similar_books_async(book_id: int, limit: int = 4) -> list[Book]:
+    rows = await run_read(_select_similar_books, book_id, limit)
+    return [_book_from_row(row) for row in rows]
 
 
 def create_book(payload: BookCreate) -> Book:
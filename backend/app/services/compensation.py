@@ -1,10 +1,14 @@
 """Compensation and earnings management."""
 
-from typing import List
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
 
+from ..config import MAX_REFERRAL_DEPTH
 from ..database.session import db_session
 from ..models.schemas import CompensationSummary, CompensationTransaction
-from ..services.users import get_user_by_id
+from ..services.users import get_user_by_id, invalidate_cached_user
 
 
 def _row_to_transaction(row) -> CompensationTransaction:
@@ -21,6 +25,43 @@ def _row_to_transaction(row) -> CompensationTransaction:
     )
 
 
+# Summary column fed by each (type, status) the dashboard reports on
+_SUMMARY_EARNING_COLUMNS = {
+    "direct_referral": "direct_referral_bonus",
+    "team_commission": "team_commission",
+    "rank_bonus": "rank_bonuses",
+}
+
+
+def _summary_column(transaction_type: str, status: str) -> str | None:
+    if status == "approved":
+        return _SUMMARY_EARNING_COLUMNS.get(transaction_type)
+    if status == "pending" and transaction_type == "payout":
+        return "pending_payouts"
+    return None
+
+
+def _apply_summary_delta(conn, user_id: int, column: str | None, amount: float) -> None:
+    """Add amount to one column of the user's compensation summary row."""
+    if column is None or not amount:
+        return
+    conn.execute(
+        f"""
+        INSERT INTO user_compensation_summary (user_id, {column}) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            {column} = {column} + excluded.{column},
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (user_id, amount),
+    )
+
+
+def _apply_status_change(conn, row, new_status: str) -> None:
+    """Move a transaction's amount between summary columns when its status changes."""
+    _apply_summary_delta(conn, row["user_id"], _summary_column(row["type"], row["status"]), -row["amount"])
+    _apply_summary_delta(conn, row["user_id"], _summary_column(row["type"], new_status), row["amount"])
+
+
 def create_transaction(
     user_id: int,
     transaction_type: str,
@@ -29,6 +70,7 @@ def create_transaction(
     reference_id: int | None = None,
 ) -> CompensationTransaction:
     """Create a new compensation transaction."""
+    credits_wallet = transaction_type in ["direct_referral", "team_commission", "rank_bonus"]
     with db_session() as conn:
         cursor = conn.cursor()
         cursor.execute(
@@ -40,8 +82,11 @@ def create_transaction(
         )
         transaction_id = cursor.lastrowid
 
+        # New transactions start out 'pending'
+        _apply_summary_delta(conn, user_id, _summary_column(transaction_type, "pending"), amount)
+
         # Update user's wallet balance for approved transactions
-        if transaction_type in ["direct_referral", "team_commission", "rank_bonus"]:
+        if credits_wallet:
             cursor.execute(
                 """
                 UPDATE users
@@ -51,12 +96,14 @@ def create_transaction(
                 (amount, amount, user_id),
             )
 
+    if credits_wallet:
+        invalidate_cached_user(user_id)
     return get_transaction_by_id(transaction_id)
 
 
 def get_transaction_by_id(transaction_id: int) -> CompensationTransaction:
     """Get a specific transaction by ID."""
-    with db_session() as conn:
+    with db_session(read_only=True) as conn:
         row = conn.execute(
             "SELECT * FROM compensation_transactions WHERE id = ?",
             (transaction_id,)
@@ -68,64 +115,102 @@ def get_transaction_by_id(transaction_id: int) -> CompensationTransaction:
     return _row_to_transaction(row)
 
 
-def get_user_transactions(user_id: int, limit: int = 50) -> List[CompensationTransaction]:
-    """Get user's compensation transactions."""
-    with db_session() as conn:
-        rows = conn.execute(
-            "SELECT * FROM compensation_transactions WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
-            (user_id, limit),
-        ).fetchall()
+def _encode_transaction_cursor(row) -> str:
+    payload = json.dumps([row["created_at"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
 
-    return [_row_to_transaction(row) for row in rows]
 
+def _decode_transaction_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(transaction_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
 
-def get_compensation_summary(user_id: int) -> CompensationSummary:
-    """Get comprehensive compensation summary for a user."""
-    with db_session() as conn:
-        # Get wallet balance and total earnings from user table
-        user_row = conn.execute(
-            "SELECT wallet_balance, total_earnings FROM users WHERE id = ?",
-            (user_id,)
-        ).fetchone()
 
-        if not user_row:
-            raise ValueError("User not found")
+def get_user_transactions_page(
+    user_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[CompensationTransaction], Optional[str]]:
+    """Get one page of a user's transactions, newest first.
+    
+    Keyset pagination on (created_at, id): ``cursor`` is the opaque value
+    returned with the previous page, so every page costs one index seek
+    however deep into the history it is. Returns the page and the cursor
+    for the next one (None on the last page).
+    """
+    query = "SELECT * FROM compensation_transactions WHERE user_id = ?"
+    params: list = [user_id]
+
+    if transaction_type:
+        query += " AND type = ?"
+        params.append(transaction_type)
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    # created_at is stored as 'YYYY-MM-DD HH:MM:SS' text
+    if created_from:
+        query += " AND created_at >= ?"
+        params.append(created_from.strftime("%Y-%m-%d %H:%M:%S"))
+    if created_to:
+        query += " AND created_at < ?"
+        params.append(created_to.strftime("%Y-%m-%d %H:%M:%S"))
+    if cursor:
+        query += " AND (created_at, id) < (?, ?)"
+        params.extend(_decode_transaction_cursor(cursor))
+
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with db_session(read_only=True) as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    next_cursor = _encode_transaction_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [_row_to_transaction(row) for row in rows[:limit]], next_cursor
 
-        # Calculate different types of earnings
-        earnings_rows = conn.execute(
-            """
-            SELECT type, SUM(amount) as total
-            FROM compensation_transactions
-            WHERE user_id = ? AND status = 'approved'
-            GROUP BY type
-            """,
-            (user_id,)
-        ).fetchall()
 
-        earnings_by_type = {row["type"]: row["total"] for row in earnings_rows}
+def get_user_transactions(user_id: int, limit: int = 50) -> List[CompensationTransaction]:
+    """Get user's most recent compensation transactions."""
+    transactions, _ = get_user_transactions_page(user_id, limit)
+    return transactions
+
 
-        # Calculate pending payouts
-        pending_row = conn.execute(
+def get_compensation_summary(user_id: int) -> CompensationSummary:
+    """Get comprehensive compensation summary for a user.
+    
+    Reads the materialized ``user_compensation_summary`` row, which is kept
+    current by transactions, payouts, commission queueing and settlement.
+    """
+    with db_session(read_only=True) as conn:
+        row = conn.execute(
             """
-            SELECT SUM(amount) as pending
-            FROM compensation_transactions
-            WHERE user_id = ? AND status = 'pending' AND type = 'payout'
+            SELECT u.wallet_balance, u.total_earnings,
+                   s.direct_referral_bonus, s.team_commission, s.rank_bonuses,
+                   s.pending_payouts, s.pending_weekly_commissions
+            FROM users u
+            LEFT JOIN user_compensation_summary s ON s.user_id = u.id
+            WHERE u.id = ?
             """,
             (user_id,)
         ).fetchone()
 
-    # Get pending weekly commissions
-    from .weekly_commissions import get_user_pending_commission
-    pending_weekly = get_user_pending_commission(user_id)
-    
+    if not row:
+        raise ValueError("User not found")
+
     return CompensationSummary(
-        total_earnings=user_row["total_earnings"],
-        wallet_balance=user_row["wallet_balance"],
-        pending_payouts=pending_row["pending"] or 0,
-        direct_referral_bonus=earnings_by_type.get("direct_referral", 0),
-        team_commission=earnings_by_type.get("team_commission", 0),
-        rank_bonuses=earnings_by_type.get("rank_bonus", 0),
-        pending_weekly_commissions=pending_weekly,
+        total_earnings=row["total_earnings"],
+        wallet_balance=row["wallet_balance"],
+        pending_payouts=row["pending_payouts"] or 0,
+        direct_referral_bonus=row["direct_referral_bonus"] or 0,
+        team_commission=row["team_commission"] or 0,
+        rank_bonuses=row["rank_bonuses"] or 0,
+        pending_weekly_commissions=row["pending_weekly_commissions"] or 0,
     )
 
 
@@ -146,13 +231,12 @@ def queue_team_commission_for_sale(buyer_id: int, sales_units: int, order_id: in
     """Queue team commissions for weekly calculation.
     
     This function traverses the upline network and queues commission calculations
-    based on tiered rates (2%, 1%, 0.1%) for weekly processing.
+    based on tiered rates (2%, 1%, 0.1%) for weekly processing. Upline levels and
+    team sales come from one closure-table read, and all queue rows are written
+    with a single executemany.
     """
     from datetime import datetime, timedelta
-    from .network import get_upline_chain, get_total_team_sales, calculate_tiered_commission_rate
-    
-    # Get all upline members
-    upline_chain = get_upline_chain(buyer_id, max_levels=10000)
+    from .network import calculate_tiered_commission_rate
     
     # Calculate period for weekly commission
     now = datetime.now()
@@ -161,38 +245,57 @@ def queue_team_commission_for_sale(buyer_id: int, sales_units: int, order_id: in
     
     # Standard package price (₹5,000 per unit as per requirements)
     PACKAGE_PRICE_PER_UNIT = 5000.0
+    sale_value = sales_units * PACKAGE_PRICE_PER_UNIT
     
     with db_session() as conn:
-        for level, referrer_id in enumerate(upline_chain, start=1):
-            # Get total team sales for this referrer
-            total_team_sales = get_total_team_sales(referrer_id)
-            
-            # Calculate tiered commission rate
-            commission_rate = calculate_tiered_commission_rate(total_team_sales)
-            
-            # Calculate commission amount
-            # Commission is based on sales units * package price * rate
-            commission_amount = sales_units * PACKAGE_PRICE_PER_UNIT * commission_rate
-            
+        # All upline members with their level and current team sales
+        upline_rows = conn.execute(
+            """
+            SELECT a.ancestor_id, a.depth, COALESCE(u.team_sales_count, 0) as total_team_sales
+            FROM user_ancestors a
+            JOIN users u ON u.id = a.ancestor_id
+            WHERE a.descendant_id = ? AND a.depth <= ?
+            ORDER BY a.depth
+            """,
+            (buyer_id, MAX_REFERRAL_DEPTH)
+        ).fetchall()
+        
+        # Commission is based on sales units * package price * tiered rate
+        queue_rows = []
+        for row in upline_rows:
+            commission_amount = sale_value * calculate_tiered_commission_rate(row["total_team_sales"])
             if commission_amount > 0:
-                # Queue commission for weekly processing
-                conn.execute(
-                    """
-                    INSERT INTO team_commission_queue 
-                    (user_id, sales_units, commission_amount, level, order_id, 
-                     calculation_period_start, calculation_period_end, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
-                    """,
+                queue_rows.append(
                     (
-                        referrer_id,
+                        row["ancestor_id"],
                         sales_units,
                         commission_amount,
-                        level,
+                        row["depth"],
                         order_id,
                         period_start.isoformat(),
                         period_end.isoformat(),
                     )
                 )
+        
+        # Queue commissions for weekly processing
+        conn.executemany(
+            """
+            INSERT INTO team_commission_queue 
+            (user_id, sales_units, commission_amount, level, order_id, 
+             calculation_period_start, calculation_period_end, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+            """,
+            queue_rows,
+        )
+        conn.executemany(
+            """
+            INSERT INTO user_compensation_summary (user_id, pending_weekly_commissions) VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                pending_weekly_commissions = pending_weekly_commissions + excluded.pending_weekly_commissions,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            [(queue_row[0], queue_row[2]) for queue_row in queue_rows],
+        )
 
 
 def process_team_commissions(user_id: int, level: int, package_amount: float) -> None:
@@ -210,61 +313,11 @@ def check_and_award_rank_bonuses(user_id: int) -> None:
     """Check user's eligibility for rank bonuses and award if qualified.
     
     Ranks are based on total sales (direct + team) in units, not revenue.
+    See ``ranks.evaluate_ranks`` for the threshold table and award rules.
     """
-    from .network import get_total_sales
-    
-    user = get_user_by_id(user_id)
-    if not user:
-        return
-
-    # Get total sales in units (direct + team)
-    total_sales_units = get_total_sales(user_id)
-
-    rank_requirements = {
-        "achiever": {"sales_units": 100, "bonus": 10000, "insurance": 0},
-        "leader": {"sales_units": 1000, "bonus": 100000, "insurance": 100000},
-        "pro_leader": {"sales_units": 10000, "bonus": 1000000, "insurance": 1000000},
-        "champion": {"sales_units": 100000, "bonus": 10000000, "insurance": 10000000},
-        "legend": {"sales_units": 1000000, "bonus": 100000000, "insurance": 100000000},
-    }
-
-    # Check each rank in order
-    rank_order = ["achiever", "leader", "pro_leader", "champion", "legend"]
-    current_rank_index = rank_order.index(user.rank) if user.rank in rank_order else -1
-
-    for rank in rank_order:
-        requirements = rank_requirements[rank]
-        
-        # Only check ranks that are higher than current rank
-        rank_index = rank_order.index(rank)
-        if rank_index <= current_rank_index:
-            continue
-        
-        # Check if user qualifies for this rank
-        if total_sales_units >= requirements["sales_units"]:
-            # Award rank bonus
-            bonus_amount = requirements["bonus"]
-            insurance_amount = requirements["insurance"]
-            
-            if bonus_amount > 0:
-                create_transaction(
-                    user_id=user_id,
-                    transaction_type="rank_bonus",
-                    amount=bonus_amount,
-                    description=f"Rank advancement bonus - {rank}",
-                    reference_id=None,
-                )
+    from .ranks import evaluate_ranks
 
-                # Update user rank
-                from .users import update_user_rank
-                update_user_rank(user_id, rank)
-                
-                # Assign insurance benefit if applicable
-                if insurance_amount > 0:
-                    assign_insurance_benefit(user_id, rank, insurance_amount)
-                
-                # Only award one rank at a time
-                break
+    evaluate_ranks([user_id])
 
 
 def assign_insurance_benefit(user_id: int, rank: str, insurance_amount: float) -> None:
@@ -288,6 +341,7 @@ def assign_insurance_benefit(user_id: int, rank: str, insurance_amount: float) -
             """,
             (user_id, rank, insurance_amount)
         )
+    invalidate_cached_user(user_id)
 
 
 def process_payout_request(user_id: int, amount: float) -> CompensationTransaction:
@@ -327,6 +381,7 @@ def process_payout_request(user_id: int, amount: float) -> CompensationTransacti
             "UPDATE users SET wallet_balance = wallet_balance - ? WHERE id = ?",
             (amount, user_id),
         )
+    invalidate_cached_user(user_id)
 
     return transaction
 
@@ -334,6 +389,14 @@ def process_payout_request(user_id: int, amount: float) -> CompensationTransacti
 def approve_payout(transaction_id: int) -> None:
     """Approve a payout transaction."""
     with db_session() as conn:
+        transaction = conn.execute(
+            "SELECT user_id, type, amount, status FROM compensation_transactions WHERE id = ? AND type = 'payout'",
+            (transaction_id,)
+        ).fetchone()
+        if not transaction:
+            return
+
+        _apply_status_change(conn, transaction, "approved")
         conn.execute(
             """
             UPDATE compensation_transactions
@@ -349,11 +412,13 @@ def reject_payout(transaction_id: int) -> None:
     with db_session() as conn:
         # Get transaction details
         transaction = conn.execute(
-            "SELECT user_id, amount FROM compensation_transactions WHERE id = ? AND type = 'payout'",
+            "SELECT user_id, type, amount, status FROM compensation_transactions WHERE id = ? AND type = 'payout'",
             (transaction_id,)
         ).fetchone()
 
         if transaction:
+            _apply_status_change(conn, transaction, "cancelled")
+
             # Refund amount to wallet
             conn.execute(
                 "UPDATE users SET wallet_balance = wallet_balance - ? WHERE id = ?",
@@ -369,3 +434,6 @@ def reject_payout(transaction_id: int) -> None:
                 """,
                 (transaction_id,)
             )
+
+    if transaction:
+        invalidate_cached_user(transaction["user_id"])
@@ -0,0 +1,121 @@
+"""SQLite-backed APScheduler job store using the application's connection pool."""
+
+import pickle
+import sqlite3
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+from ..database.session import db_session
+
+
+class SQLiteJobStore(BaseJobStore):
+    """Persist scheduled jobs in the ``apscheduler_jobs`` table.
+
+    Mirrors APScheduler's SQLAlchemy job store without requiring SQLAlchemy, so
+    next run times survive restarts and missed runs can be caught up.
+    """
+
+    def __init__(self, pickle_protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        super().__init__()
+        self.pickle_protocol = pickle_protocol
+
+    def lookup_job(self, job_id):
+        with db_session() as conn:
+            row = conn.execute(
+                "SELECT job_state FROM apscheduler_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._reconstitute_job(row["job_state"]) if row else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+
+    def get_next_run_time(self):
+        with db_session() as conn:
+            row = conn.execute(
+                """
+                SELECT next_run_time FROM apscheduler_jobs
+                WHERE next_run_time IS NOT NULL
+                ORDER BY next_run_time
+                LIMIT 1
+                """
+            ).fetchone()
+        return utc_timestamp_to_datetime(row["next_run_time"]) if row else None
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        try:
+            with db_session() as conn:
+                conn.execute(
+                    "INSERT INTO apscheduler_jobs (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                    (
+                        job.id,
+                        datetime_to_utc_timestamp(job.next_run_time),
+                        pickle.dumps(job.__getstate__(), self.pickle_protocol),
+                    ),
+                )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        with db_session() as conn:
+            cursor = conn.execute(
+                "UPDATE apscheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+                (
+                    datetime_to_utc_timestamp(job.next_run_time),
+                    pickle.dumps(job.__getstate__(), self.pickle_protocol),
+                    job.id,
+                ),
+            )
+            if cursor.rowcount == 0:
+                raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        with db_session() as conn:
+            cursor = conn.execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+            if cursor.rowcount == 0:
+                raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        with db_session() as conn:
+            conn.execute("DELETE FROM apscheduler_jobs")
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where: str = "", params: tuple = ()):
+        jobs = []
+        failed_job_ids = []
+        with db_session() as conn:
+            rows = conn.execute(
+                f"SELECT id, job_state FROM apscheduler_jobs {where} ORDER BY next_run_time",
+                params,
+            ).fetchall()
+            for row in rows:
+                try:
+                    jobs.append(self._reconstitute_job(row["job_state"]))
+                except BaseException:
+                    self._logger.exception('Unable to restore job "%s" -- removing it', row["id"])
+                    failed_job_ids.append(row["id"])
+
+            # Remove all the jobs we failed to restore
+            if failed_job_ids:
+                conn.executemany(
+                    "DELETE FROM apscheduler_jobs WHERE id = ?",
+                    [(job_id,) for job_id in failed_job_ids],
+                )
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
@@ -0,0 +1,59 @@
+"""SQLite-backed leases for electing a single leader across workers."""
+
+import time
+
+from ..database.session import db_session
+
+
+def try_acquire_lease(name: str, holder: str, ttl_seconds: float) -> bool:
+    """Acquire or renew a lease.
+
+    Succeeds if the lease is free, expired, or already held by ``holder``; the
+    expiry is then pushed ``ttl_seconds`` into the future. The upsert is a single
+    statement, so concurrent workers cannot both win.
+    """
+    now = time.time()
+    with db_session() as conn:
+        conn.execute(
+            """
+            INSERT INTO scheduler_leases (name, holder, expires_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                holder = excluded.holder,
+                expires_at = excluded.expires_at,
+                acquired_at = CASE
+                    WHEN scheduler_leases.holder = excluded.holder THEN scheduler_leases.acquired_at
+                    ELSE CURRENT_TIMESTAMP
+                END,
+                renewed_at = CURRENT_TIMESTAMP
+            WHERE scheduler_leases.holder = excluded.holder OR scheduler_leases.expires_at < ?
+            """,
+            (name, holder, now + ttl_seconds, now),
+        )
+        row = conn.execute(
+            "SELECT holder FROM scheduler_leases WHERE name = ?", (name,)
+        ).fetchone()
+    return row is not None and row["holder"] == holder
+
+
+def release_lease(name: str, holder: str) -> None:
+    """Release a lease if ``holder`` still owns it."""
+    with db_session() as conn:
+        conn.execute(
+            "DELETE FROM scheduler_leases WHERE name = ? AND holder = ?",
+            (name, holder),
+        )
+
+
+def get_lease(name: str) -> dict | None:
+    """Get the current holder and expiry of a lease."""
+    with db_session() as conn:
+        row = conn.execute(
+            "SELECT name, holder, expires_at, acquired_at, renewed_at FROM scheduler_leases WHERE name = ?",
+            (name,),
+        ).fetchone()
+    if not row:
+        return None
+    lease = dict(row)
+    lease["expired"] = lease["expires_at"] < time.time()
+    return lease
@@ -1,8 +1,8 @@
 """Network traversal utilities for single-leg compensation plan."""
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from ..database.session import db_session
-from ..services.users import get_user_by_id
+from ..services.users import get_user_by_id, invalidate_cached_user, invalidate_cached_users
 
 
 def get_total_team_sales(user_id: int) -> int:
@@ -42,35 +42,104 @@ def get_total_sales(user_id: int) -> int:
     return direct + team
 
 
+UPLINE_CHUNK_SIZE = 500
+
+# Upline lookup is a single indexed read on the user_ancestors closure table
+# (see migrate_add_user_ancestors and create_user).
+_UPLINE_QUERY = """
+    SELECT descendant_id, ancestor_id, depth AS level
+    FROM user_ancestors
+    WHERE descendant_id IN ({placeholders}) AND depth <= ?
+    ORDER BY descendant_id, depth
+"""
+
+
+def _trim_cycle(user_id: int, chain: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Cut a chain at the first ancestor that was already seen."""
+    seen = {user_id}
+    trimmed = []
+    for ancestor_id, level in chain:
+        if ancestor_id in seen:
+            break
+        seen.add(ancestor_id)
+        trimmed.append((ancestor_id, level))
+    return trimmed
+
+
+def get_upline_chains_with_levels(
+    user_ids: Iterable[int], max_levels: int = 10000
+) -> Dict[int, List[Tuple[int, int]]]:
+    """Get ``(ancestor_id, level)`` pairs for many users at once.
+
+    Level 1 is the direct referrer. Users without a referrer map to an empty list.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    chains: Dict[int, List[Tuple[int, int]]] = {user_id: [] for user_id in unique_ids}
+    if not unique_ids or max_levels <= 0:
+        return chains
+
+    with db_session(read_only=True) as conn:
+        for start in range(0, len(unique_ids), UPLINE_CHUNK_SIZE):
+            chunk = unique_ids[start:start + UPLINE_CHUNK_SIZE]
+            query = _UPLINE_QUERY.format(placeholders=", ".join("?" for _ in chunk))
+            for row in conn.execute(query, (*chunk, max_levels)):
+                chains[row["descendant_id"]].append((row["ancestor_id"], row["level"]))
+
+    return {user_id: _trim_cycle(user_id, chain) for user_id, chain in chains.items()}
+
+
+def get_upline_chains(user_ids: Iterable[int], max_levels: int = 10000) -> Dict[int, List[int]]:
+    """Get the upline chain (ancestor IDs, nearest first) for many users at once."""
+    return {
+        user_id: [ancestor_id for ancestor_id, _ in chain]
+        for user_id, chain in get_upline_chains_with_levels(user_ids, max_levels).items()
+    }
+
+
+def get_upline_chain_with_levels(user_id: int, max_levels: int = 10000) -> List[Tuple[int, int]]:
+    """Get ``(ancestor_id, level)`` pairs for a single user's upline."""
+    return get_upline_chains_with_levels([user_id], max_levels)[user_id]
+
+
 def get_upline_chain(user_id: int, max_levels: int = 10000) -> List[int]:
     """Get the upline chain (referrer chain) for a user.
     
     Returns list of user IDs from direct referrer up to root, up to max_levels deep.
     """
-    upline_chain = []
-    current_user_id = user_id
-    level = 0
-    
-    while current_user_id and level < max_levels:
-        # Get referrer_id directly from database
-        with db_session() as conn:
-            row = conn.execute(
-                "SELECT referrer_id FROM users WHERE id = ?",
-                (current_user_id,)
-            ).fetchone()
-        
-        if not row or not row["referrer_id"]:
-            break
-        
-        referrer_id = row["referrer_id"]
-        if referrer_id in upline_chain:  # Prevent infinite loops
-            break
-        
-        upline_chain.append(referrer_id)
-        current_user_id = referrer_id
-        level += 1
-    
-    return upline_chain
+    return [ancestor_id for ancestor_id, _ in get_upline_chain_with_levels(user_id, max_levels)]
+
+
+def get_downline_counts(user_ids: Iterable[int], max_depth: int | None = None) -> Dict[int, int]:
+    """Get the number of downline members (all depths, or up to max_depth) for many users."""
+    unique_ids = list(dict.fromkeys(user_ids))
+    counts = {user_id: 0 for user_id in unique_ids}
+    if not unique_ids:
+        return counts
+
+    depth_filter = "" if max_depth is None else " AND depth <= ?"
+    with db_session(read_only=True) as conn:
+        for start in range(0, len(unique_ids), UPLINE_CHUNK_SIZE):
+            chunk = unique_ids[start:start + UPLINE_CHUNK_SIZE]
+            params: list = list(chunk)
+            if max_depth is not None:
+                params.append(max_depth)
+            rows = conn.execute(
+                f"""
+                SELECT ancestor_id, COUNT(*) as total
+                FROM user_ancestors
+                WHERE ancestor_id IN ({", ".join("?" for _ in chunk)}){depth_filter}
+                GROUP BY ancestor_id
+                """,
+                params,
+            ).fetchall()
+            for row in rows:
+                counts[row["ancestor_id"]] = row["total"]
+    return counts
+
+
+def get_team_size(user_id: int) -> int:
+    """Get the total number of members in a user's downline."""
+    return get_downline_counts([user_id])[user_id]
 
 
 def update_user_sales_count(user_id: int, sales_units: int) -> None:
@@ -85,25 +154,33 @@ def update_user_sales_count(user_id: int, sales_units: int) -> None:
             """,
             (sales_units, user_id)
         )
+    invalidate_cached_user(user_id)
 
 
-def propagate_sales_to_upline(buyer_id: int, sales_units: int) -> None:
+def propagate_sales_to_upline(buyer_id: int, sales_units: int) -> int:
     """Propagate sales units up the referral chain.
     
-    Updates team_sales_count for all upline members.
+    Updates team_sales_count for all upline members in a single statement
+    driven by the user_ancestors closure table. Returns the number of
+    upline members updated.
     """
-    upline_chain = get_upline_chain(buyer_id)
-    
     with db_session() as conn:
-        for referrer_id in upline_chain:
-            conn.execute(
-                """
-                UPDATE users
-                SET team_sales_count = COALESCE(team_sales_count, 0) + ?
-                WHERE id = ?
-                """,
-                (sales_units, referrer_id)
+        cursor = conn.execute(
+            """
+            UPDATE users
+            SET team_sales_count = COALESCE(team_sales_count, 0) + ?
+            WHERE id IN (
+                SELECT ancestor_id FROM user_ancestors WHERE descendant_id = ?
             )
+            """,
+            (sales_units, buyer_id)
+        )
+        ancestor_ids = [
+            row["ancestor_id"]
+            for row in conn.execute("SELECT ancestor_id FROM user_ancestors WHERE descendant_id = ?", (buyer_id,))
+        ]
+    invalidate_cached_users(ancestor_ids)
+    return cursor.rowcount
 
 
 def calculate_tiered_commission_rate(total_team_sales: int) -> float:
@@ -2,17 +2,18 @@
 
 from fastapi import HTTPException, status
 
-from ..database.session import db_session
+from ..database.session import db_session, transaction
 from ..models.schemas import OrderCreate, OrderDetail, OrderSummary
 from ..services.compensation import (
     process_direct_referral_bonus,
     queue_team_commission_for_sale,
-    check_and_award_rank_bonuses,
 )
 from ..services.network import (
     update_user_sales_count,
     propagate_sales_to_upline,
 )
+from ..services.outbox import enqueue_compensation_event
+from ..services.ranks import evaluate_ranks_after_sale
 from ..services.users import get_user_by_id
 
 
@@ -65,7 +66,7 @@ def create_package_order(user_id: int, payload: OrderCreate) -> OrderDetail:
     if not package_row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Package not found")
 
-    with db_session() as conn:
+    with transaction() as conn:
         cursor = conn.cursor()
         # Calculate sales units: 1 unit = ₹5,000 (as per requirements)
         # For variable-priced packages, normalize to units
@@ -88,8 +89,9 @@ def create_package_order(user_id: int, payload: OrderCreate) -> OrderDetail:
         )
         order_id = cursor.lastrowid
 
-    # Process compensation (this would normally happen after payment confirmation)
-    _process_compensation_for_order(user_id, payload.package_id, package_row["price"], order_id, sales_units)
+        # Compensation is applied asynchronously by the outbox worker
+        # (this would normally happen after payment confirmation)
+        enqueue_compensation_event(order_id, user_id, payload.package_id, package_row["price"], sales_units)
 
     return get_order_detail(order_id)
 
@@ -130,8 +132,8 @@ def _process_compensation_for_order(
     # This traverses the entire upline network and queues commissions
     queue_team_commission_for_sale(user_id, sales_units, order_id, amount)
 
-    # Check and award rank bonuses (if user qualifies for new rank)
-    check_and_award_rank_bonuses(user_id)
+    # Promote the buyer and any upline member whose sales crossed a rank threshold
+    evaluate_ranks_after_sale(user_id)
 
 
 def list_user_orders(user_id: int) -> list[OrderSummary]:
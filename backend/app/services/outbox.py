@@ -0,0 +1,193 @@
+"""Asynchronous compensation processing via the compensation outbox.
+
+Orders only record a compensation event; a background worker applies sales
+counts, upline propagation, referral bonus, commission queueing and rank
+checks later, so checkout latency does not depend on network depth.
+"""
+
+import logging
+import threading
+
+from ..config import settings
+from ..database.session import db_session, on_commit, transaction
+
+logger = logging.getLogger(__name__)
+
+# Global worker state
+_worker_thread: threading.Thread | None = None
+_stop_event = threading.Event()
+_wake_event = threading.Event()
+
+
+def enqueue_compensation_event(
+    order_id: int, user_id: int, package_id: int, amount: float, sales_units: int
+) -> None:
+    """Record a compensation event for an order (idempotent per order_id)."""
+    with db_session() as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO compensation_outbox (order_id, user_id, package_id, amount, sales_units)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (order_id, user_id, package_id, amount, sales_units),
+        )
+    # Inside a request or transaction() the event is only visible once committed
+    on_commit(_wake_event.set)
+
+
+def process_compensation_event(event_id: int) -> bool:
+    """Process a single outbox event.
+
+    The claim, the compensation writes and the completion mark share one
+    transaction, so an event is either fully applied once or not at all.
+    Returns True if this call applied the event.
+    """
+    from .orders import _process_compensation_for_order
+
+    try:
+        with transaction() as conn:
+            claimed = conn.execute(
+                """
+                UPDATE compensation_outbox
+                SET status = 'done', processed_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'pending'
+                """,
+                (event_id,),
+            )
+            if claimed.rowcount != 1:
+                # Already handled by another worker
+                return False
+
+            event = conn.execute(
+                "SELECT * FROM compensation_outbox WHERE id = ?", (event_id,)
+            ).fetchone()
+            _process_compensation_for_order(
+                event["user_id"],
+                event["package_id"],
+                event["amount"],
+                event["order_id"],
+                event["sales_units"],
+            )
+        return True
+    except Exception as exc:
+        logger.warning(f"Compensation event {event_id} failed: {exc}", exc_info=True)
+        _record_failure(event_id, exc)
+        return False
+
+
+def _record_failure(event_id: int, exc: Exception) -> None:
+    """Schedule a retry with exponential backoff, or mark the event failed."""
+    with db_session() as conn:
+        row = conn.execute(
+            "SELECT attempts FROM compensation_outbox WHERE id = ?", (event_id,)
+        ).fetchone()
+        if not row:
+            return
+        attempts = row["attempts"] + 1
+        delay = settings.compensation_retry_base_seconds * (2 ** (attempts - 1))
+        conn.execute(
+            """
+            UPDATE compensation_outbox
+            SET attempts = ?,
+                last_error = ?,
+                status = CASE WHEN ? >= ? THEN 'failed' ELSE 'pending' END,
+                available_at = datetime('now', ?)
+            WHERE id = ?
+            """,
+            (
+                attempts,
+                str(exc)[:1000],
+                attempts,
+                settings.compensation_max_attempts,
+                f"+{int(delay)} seconds",
+                event_id,
+            ),
+        )
+
+
+def process_pending_compensation_events(limit: int | None = None) -> dict:
+    """Process due outbox events in creation order.
+
+    Returns:
+        dict with processing statistics
+    """
+    stats = {"processed": 0, "failed": 0, "skipped": 0}
+
+    with db_session(read_only=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT id FROM compensation_outbox
+            WHERE status = 'pending' AND available_at <= datetime('now')
+            ORDER BY id
+            LIMIT ?
+            """,
+            (limit or settings.compensation_worker_batch_size,),
+        ).fetchall()
+
+    for row in rows:
+        if process_compensation_event(row["id"]):
+            stats["processed"] += 1
+        else:
+            with db_session(read_only=True) as conn:
+                status_row = conn.execute(
+                    "SELECT status FROM compensation_outbox WHERE id = ?", (row["id"],)
+                ).fetchone()
+            if status_row and status_row["status"] == "done":
+                stats["skipped"] += 1
+            else:
+                stats["failed"] += 1
+
+    return stats
+
+
+def get_compensation_outbox_stats() -> dict:
+    """Get outbox event counts by status."""
+    with db_session(read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) as count FROM compensation_outbox GROUP BY status"
+        ).fetchall()
+    return {row["status"]: row["count"] for row in rows}
+
+
+def _worker_loop() -> None:
+    logger.info("Compensation worker started")
+    while not _stop_event.is_set():
+        try:
+            stats = process_pending_compensation_events()
+        except Exception as e:
+            logger.error(f"Error in compensation worker: {e}", exc_info=True)
+            stats = {"processed": 0}
+        if stats["processed"] >= settings.compensation_worker_batch_size:
+            # Backlog: keep draining without waiting
+            continue
+        _wake_event.wait(settings.compensation_worker_poll_seconds)
+        _wake_event.clear()
+    logger.info("Compensation worker stopped")
+
+
+def start_compensation_worker() -> None:
+    """Start the background compensation worker thread."""
+    global _worker_thread
+
+    if not settings.compensation_worker_enabled:
+        return
+    if _worker_thread is not None and _worker_thread.is_alive():
+        return
+
+    _stop_event.clear()
+    _worker_thread = threading.Thread(
+        target=_worker_loop, name="compensation-worker", daemon=True
+    )
+    _worker_thread.start()
+
+
+def stop_compensation_worker(timeout: float = 10.0) -> None:
+    """Stop the background compensation worker thread."""
+    global _worker_thread
+
+    if _worker_thread is None:
+        return
+    _stop_event.set()
+    _wake_event.set()
+    _worker_thread.join(timeout)
+    _worker_thread = None
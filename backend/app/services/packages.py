@@ -1,5 +1,6 @@
 """Package service logic."""
 
+from ..database.async_session import run_read
 from ..database.session import db_session
 from ..models.schemas import Package
 
@@ -26,29 +27,41 @@ def _row_to_package(row) -> Package:
     )
 
 
+def _select_packages(conn, active_only: bool):
+    if active_only:
+        return conn.execute(
+            "SELECT * FROM packages WHERE is_active = 1 ORDER BY price ASC"
+        ).fetchall()
+    return conn.execute(
+        "SELECT * FROM packages ORDER BY price ASC"
+    ).fetchall()
+
+
+def _select_package(conn, package_id: int):
+    return conn.execute(
+        "SELECT * FROM packages WHERE id = ?", (package_id,)
+    ).fetchone()
+
+
 def list_packages(active_only: bool = True) -> list[Package]:
     """Get all packages."""
-    with db_session() as conn:
-        if active_only:
-            rows = conn.execute(
-                "SELECT * FROM packages WHERE is_active = 1 ORDER BY price ASC"
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                "SELECT * FROM packages ORDER BY price ASC"
-            ).fetchall()
-    
+    with db_session(read_only=True) as conn:
+        rows = _select_packages(conn, active_only)
+    return [_row_to_package(row) for row in rows]
+
+
+async def list_packages_async(active_only: bool = True) -> list[Package]:
+    rows = await run_read(_select_packages, active_only)
     return [_row_to_package(row) for row in rows]
 
 
 def get_package(package_id: int) -> Package | None:
     """Get a specific package by ID."""
-    with db_session() as conn:
-        row = conn.execute(
-            "SELECT * FROM packages WHERE id = ?", (package_id,)
-        ).fetchone()
-    
-    if row:
-        return _row_to_package(row)
-    return None
+    with db_session(read_only=True) as conn:
+        row = _select_package(conn, package_id)
+    return _row_to_package(row) if row else None
+
 
+async def get_package_async(package_id: int) -> Package | None:
+    row = await run_read(_select_package, package_id)
+    return _row_to_package(row) if row else None
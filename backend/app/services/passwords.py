@@ -0,0 +1,31 @@
+"""Login password checks shared by user and admin authentication."""
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.security import verify_password_and_rehash_async
+from ..database.session import db_session
+
+# Tables whose rows carry ``id`` and ``password_hash`` columns
+_PASSWORD_TABLES = ("users", "admins")
+
+
+def _store_rehashed_password(table: str, row_id: int, old_hash: str, new_hash: str) -> None:
+    # Skip if the password changed since it was verified
+    with db_session() as conn:
+        conn.execute(
+            f"UPDATE {table} SET password_hash = ? WHERE id = ? AND password_hash = ?",
+            (new_hash, row_id, old_hash),
+        )
+
+
+async def check_login_password(table: str, row, plain_password: str) -> bool:
+    """Verify a login password against ``row``, upgrading its hash to the current policy.
+
+    Hashing runs in the password hashing pool, the update in the threadpool.
+    """
+    if table not in _PASSWORD_TABLES:
+        raise ValueError(f"Unknown password table: {table}")
+    valid, new_hash = await verify_password_and_rehash_async(plain_password, row["password_hash"])
+    if valid and new_hash:
+        await run_in_threadpool(_store_rehashed_password, table, row["id"], row["password_hash"], new_hash)
+    return valid
@@ -0,0 +1,394 @@
+"""Rank evaluation engine.
+
+Ranks come from the sorted ``rank_thresholds`` table. After a sale has been
+propagated, the buyer and every ancestor are checked in one set-based query
+that returns only threshold crossings, so the work done in Python scales with
+the number of promotions rather than with users times ranks.
+"""
+
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..database.session import db_session, transaction
+from .compensation import assign_insurance_benefit, create_transaction
+from .users import invalidate_cached_user
+
+# Crossings for a set of candidate users: every rank above the user's current
+# rank whose threshold is met by direct plus team sales. Ranks missing from
+# the table (legacy values) count as the bottom of the ladder.
+_CROSSINGS_QUERY = """
+    WITH candidates(user_id) AS ({candidates})
+    SELECT
+        u.id AS user_id,
+        u.rank AS current_rank,
+        t.rank,
+        t.rank_order,
+        t.bonus,
+        t.insurance
+    FROM candidates c
+    JOIN users u ON u.id = c.user_id
+    LEFT JOIN rank_thresholds cur ON cur.rank = u.rank
+    JOIN rank_thresholds t
+        ON t.rank_order > COALESCE(cur.rank_order, 0)
+       AND t.min_sales_units <= COALESCE(u.total_sales_count, 0) + COALESCE(u.team_sales_count, 0)
+    ORDER BY u.id, t.rank_order
+"""
+
+_ANCESTOR_CANDIDATES = """
+    SELECT ancestor_id FROM user_ancestors WHERE descendant_id = ?
+    UNION
+    SELECT ?
+"""
+
+RANK_CHUNK_SIZE = 500
+
+
+def get_rank_thresholds() -> List[dict]:
+    """Get the rank ladder ordered from lowest to highest."""
+    with db_session(read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT rank, rank_order, min_sales_units, bonus, insurance FROM rank_thresholds ORDER BY rank_order"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _group_crossings(rows) -> Dict[int, List[dict]]:
+    crossings: Dict[int, List[dict]] = {}
+    for row in rows:
+        crossings.setdefault(row["user_id"], []).append(dict(row))
+    return crossings
+
+
+def find_rank_crossings(user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Get the ranks each user has newly qualified for, lowest first."""
+    user_ids = list(dict.fromkeys(user_ids))
+    crossings: Dict[int, List[dict]] = {}
+    with db_session(read_only=True) as conn:
+        for start in range(0, len(user_ids), RANK_CHUNK_SIZE):
+            chunk = user_ids[start:start + RANK_CHUNK_SIZE]
+            candidates = " UNION ALL ".join(["SELECT ?"] * len(chunk))
+            rows = conn.execute(_CROSSINGS_QUERY.format(candidates=candidates), chunk).fetchall()
+            crossings.update(_group_crossings(rows))
+    return crossings
+
+
+def _award_crossings(conn, user_id: int, current_rank: str, crossings: List[dict]) -> List[str]:
+    """Promote a user to the highest crossed rank and pay every crossed rank's bonus.
+
+    The rank update only applies if the rank is still the one evaluated, so
+    concurrent evaluations cannot pay the same bonus twice. Each rank's bonus
+    and insurance are paid once per user: ranks already in rank_bonuses_paid
+    (re-crossed after a demotion) are skipped.
+    """
+    new_rank = crossings[-1]["rank"]
+    claimed = conn.execute(
+        "UPDATE users SET rank = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND rank IS ?",
+        (new_rank, user_id, current_rank),
+    )
+    if claimed.rowcount != 1:
+        return []
+    invalidate_cached_user(user_id)
+
+    for crossing in crossings:
+        first_award = conn.execute(
+            "INSERT OR IGNORE INTO rank_bonuses_paid (user_id, rank) VALUES (?, ?)",
+            (user_id, crossing["rank"]),
+        ).rowcount == 1
+        if not first_award:
+            continue
+        if crossing["bonus"] > 0:
+            create_transaction(
+                user_id=user_id,
+                transaction_type="rank_bonus",
+                amount=crossing["bonus"],
+                description=f"Rank advancement bonus - {crossing['rank']}",
+                reference_id=None,
+            )
+        if crossing["insurance"] > 0:
+            assign_insurance_benefit(user_id, crossing["rank"], crossing["insurance"])
+    return [crossing["rank"] for crossing in crossings]
+
+
+def _apply_crossings(crossings: Dict[int, List[dict]]) -> Dict[int, List[str]]:
+    promoted: Dict[int, List[str]] = {}
+    # Bonus transactions and insurance rows join this transaction
+    with transaction() as conn:
+        for user_id, user_crossings in crossings.items():
+            awarded = _award_crossings(conn, user_id, user_crossings[0]["current_rank"], user_crossings)
+            if awarded:
+                promoted[user_id] = awarded
+    return promoted
+
+
+def evaluate_ranks(user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Promote any of the given users who crossed a rank threshold.
+
+    Returns the ranks awarded per promoted user.
+    """
+    return _apply_crossings(find_rank_crossings(user_ids))
+
+
+def evaluate_ranks_after_sale(buyer_id: int) -> Dict[int, List[str]]:
+    """Promote the buyer and any upline member whose sales crossed a threshold.
+
+    Candidates come straight from the user_ancestors closure table, so the
+    whole upline is evaluated in one query.
+    """
+    with db_session(read_only=True) as conn:
+        rows = conn.execute(
+            _CROSSINGS_QUERY.format(candidates=_ANCESTOR_CANDIDATES), (buyer_id, buyer_id)
+        ).fetchall()
+    return _apply_crossings(_group_crossings(rows))
+
+
+# Users in an id range whose rank differs from the highest rank their sales
+# qualify for, in either direction.
+_RANK_DIFF_QUERY = """
+    SELECT user_id, current_rank, current_order, target.rank AS target_rank, target.rank_order AS target_order
+    FROM (
+        SELECT
+            u.id AS user_id,
+            u.rank AS current_rank,
+            COALESCE(cur.rank_order, 0) AS current_order,
+            (
+                SELECT t.rank FROM rank_thresholds t
+                WHERE t.min_sales_units <= COALESCE(u.total_sales_count, 0) + COALESCE(u.team_sales_count, 0)
+                ORDER BY t.rank_order DESC
+                LIMIT 1
+            ) AS target_rank
+        FROM users u
+        LEFT JOIN rank_thresholds cur ON cur.rank = u.rank
+        WHERE u.id > ? AND u.id <= ?
+    ) d
+    JOIN rank_thresholds target ON target.rank = d.target_rank
+    WHERE d.current_rank IS NOT d.target_rank
+    ORDER BY user_id
+"""
+
+
+def recompute_all_ranks(
+    dry_run: bool = True,
+    chunk_size: Optional[int] = None,
+    start_after_user_id: int = 0,
+    max_chunks: Optional[int] = None,
+    report_limit: int = 100,
+) -> dict:
+    """Recompute every user's rank from the current threshold table.
+    
+    Walks users by id in chunks of ``chunk_size``. Users whose sales qualify
+    for a higher rank are promoted with the bonus and insurance of each rank
+    they pass; users below their rank's threshold (after a plan change) are
+    moved down without clawing back bonuses, and are not paid again if they
+    re-cross a rank. Each chunk is applied in its own transaction.
+    
+    With dry_run, nothing is written and the report describes what would
+    change. ``last_user_id`` and ``completed`` in the report let a run be
+    continued with ``start_after_user_id`` when limited by ``max_chunks``.
+    """
+    chunk_size = chunk_size or settings.rank_recompute_chunk_size
+    thresholds = get_rank_thresholds()
+
+    report = {
+        "dry_run": dry_run,
+        "users_scanned": 0,
+        "promotions": 0,
+        "demotions": 0,
+        "skipped": 0,
+        "bonus_total": 0.0,
+        "transitions": {},
+        "changes": [],
+        "last_user_id": start_after_user_id,
+        "completed": False,
+    }
+
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        with db_session(read_only=True) as conn:
+            end_row = conn.execute(
+                """
+                SELECT MAX(id) AS end_user_id, COUNT(*) AS users FROM (
+                    SELECT id FROM users WHERE id > ? ORDER BY id LIMIT ?
+                )
+                """,
+                (report["last_user_id"], chunk_size),
+            ).fetchone()
+            if end_row["end_user_id"] is None:
+                report["completed"] = True
+                break
+            chunk_range = (report["last_user_id"], end_row["end_user_id"])
+            diffs = conn.execute(_RANK_DIFF_QUERY, chunk_range).fetchall()
+            paid = {
+                (row["user_id"], row["rank"])
+                for row in conn.execute(
+                    "SELECT user_id, rank FROM rank_bonuses_paid WHERE user_id > ? AND user_id <= ?",
+                    chunk_range,
+                )
+            }
+
+        changes = []
+        for diff in diffs:
+            crossed = [
+                threshold for threshold in thresholds
+                if diff["current_order"] < threshold["rank_order"] <= diff["target_order"]
+            ]
+            changes.append({
+                "user_id": diff["user_id"],
+                "current_rank": diff["current_rank"],
+                "new_rank": diff["target_rank"],
+                "bonus": sum(
+                    threshold["bonus"] for threshold in crossed
+                    if (diff["user_id"], threshold["rank"]) not in paid
+                ),
+                "crossed": crossed,
+            })
+
+        if not dry_run and changes:
+            with transaction() as conn:
+                for change in changes:
+                    if change["crossed"]:
+                        applied = _award_crossings(conn, change["user_id"], change["current_rank"], change["crossed"])
+                    else:
+                        applied = conn.execute(
+                            "UPDATE users SET rank = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND rank IS ?",
+                            (change["new_rank"], change["user_id"], change["current_rank"]),
+                        ).rowcount == 1
+                        invalidate_cached_user(change["user_id"])
+                    change["applied"] = bool(applied)
+
+        for change in changes:
+            if change.get("applied") is False:
+                report["skipped"] += 1
+                continue
+            report["promotions" if change["crossed"] else "demotions"] += 1
+            report["bonus_total"] += change["bonus"]
+            transition = f"{change['current_rank']}->{change['new_rank']}"
+            report["transitions"][transition] = report["transitions"].get(transition, 0) + 1
+            if len(report["changes"]) < report_limit:
+                report["changes"].append({
+                    "user_id": change["user_id"],
+                    "current_rank": change["current_rank"],
+                    "new_rank": change["new_rank"],
+                    "bonus": change["bonus"],
+                })
+
+        report["users_scanned"] += end_row["users"]
+        report["last_user_id"] = end_row["end_user_id"]
+        chunks += 1
+
+    return report
+
+
+def get_rank_recompute_run(run_id: str) -> dict | None:
+    """Get a background rank recomputation run and its checkpoint."""
+    with db_session(read_only=True) as conn:
+        row = conn.execute("SELECT * FROM rank_recompute_runs WHERE run_id = ?", (run_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def start_rank_recompute_run(chunk_size: Optional[int] = None, start_after_user_id: int = 0) -> str:
+    """Create a rank recomputation run to be applied by ``resume_rank_recompute_run``.
+
+    Refuses to start while another run is incomplete; resume that one first.
+    """
+    run_id = uuid.uuid4().hex
+    with transaction() as conn:
+        incomplete = conn.execute(
+            "SELECT run_id FROM rank_recompute_runs WHERE status != 'completed' LIMIT 1"
+        ).fetchone()
+        if incomplete:
+            raise ValueError(f"Rank recompute run {incomplete['run_id']} is not completed; resume it first")
+        conn.execute(
+            "INSERT INTO rank_recompute_runs (run_id, chunk_size, last_user_id) VALUES (?, ?, ?)",
+            (run_id, chunk_size or settings.rank_recompute_chunk_size, start_after_user_id),
+        )
+    return run_id
+
+
+def _apply_next_recompute_chunk(run_id: str) -> bool:
+    """Apply one chunk of a run; its rank changes and checkpoint commit together.
+
+    Returns False when there is nothing left to recompute.
+    """
+    with transaction() as conn:
+        run = conn.execute(
+            "SELECT chunk_size, last_user_id FROM rank_recompute_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if not run:
+            raise ValueError("Rank recompute run not found")
+        report = recompute_all_ranks(
+            dry_run=False,
+            chunk_size=run["chunk_size"],
+            start_after_user_id=run["last_user_id"],
+            max_chunks=1,
+            report_limit=0,
+        )
+        if report["completed"]:
+            return False
+        conn.execute(
+            """
+            UPDATE rank_recompute_runs
+            SET last_user_id = ?,
+                users_scanned = users_scanned + ?,
+                promotions = promotions + ?,
+                demotions = demotions + ?,
+                skipped = skipped + ?,
+                bonus_total = bonus_total + ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ?
+            """,
+            (
+                report["last_user_id"],
+                report["users_scanned"],
+                report["promotions"],
+                report["demotions"],
+                report["skipped"],
+                report["bonus_total"],
+                run_id,
+            ),
+        )
+    return True
+
+
+def resume_rank_recompute_run(run_id: str, max_chunks: Optional[int] = None) -> dict:
+    """Apply a run chunk by chunk from its last checkpoint.
+
+    Each chunk holds the write lock only for its own transaction, so other
+    writers interleave between chunks; an interrupted run can be resumed.
+    """
+    chunks = 0
+    try:
+        with db_session() as conn:
+            conn.execute(
+                "UPDATE rank_recompute_runs SET status = 'running', last_error = NULL WHERE run_id = ? AND status = 'failed'",
+                (run_id,),
+            )
+        while max_chunks is None or chunks < max_chunks:
+            if not _apply_next_recompute_chunk(run_id):
+                with db_session() as conn:
+                    conn.execute(
+                        """
+                        UPDATE rank_recompute_runs
+                        SET status = 'completed', completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                        WHERE run_id = ? AND status != 'completed'
+                        """,
+                        (run_id,),
+                    )
+                break
+            chunks += 1
+    except Exception as exc:
+        with db_session() as conn:
+            conn.execute(
+                """
+                UPDATE rank_recompute_runs
+                SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE run_id = ?
+                """,
+                (str(exc)[:1000], run_id),
+            )
+        raise
+
+    run = get_rank_recompute_run(run_id)
+    if not run:
+        raise ValueError("Rank recompute run not found")
+    return run
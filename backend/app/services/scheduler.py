@@ -1,12 +1,35 @@
 """Scheduled tasks for weekly commission processing."""
 
+import functools
 import logging
+import os
+import socket
+import threading
+import uuid
+import time as time_module
 from contextlib import asynccontextmanager
 from datetime import datetime, time
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+)
+from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
+from apscheduler.jobstores.base import ConflictingIdError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from ..config import settings
+from ..core.security import shutdown_hash_executor
+from ..database.init import initialize_database, verify_schema_version
+from ..database.async_session import close_async_reader
+from ..database.session import close_pool, db_session
+from .jobstore import SQLiteJobStore
+from .leases import get_lease, release_lease, try_acquire_lease
+from .outbox import start_compensation_worker, stop_compensation_worker
 from .weekly_commissions import process_weekly_team_commissions
 
 logger = logging.getLogger(__name__)
@@ -14,44 +37,329 @@ logger = logging.getLogger(__name__)
 # Global scheduler instance
 scheduler: AsyncIOScheduler | None = None
 
+# Leader election: only the lease holder runs leader-only jobs
+LEADER_LEASE_NAME = "scheduler"
+LEADER_HEARTBEAT_JOB_ID = "scheduler_leader_heartbeat"
+# The heartbeat changes this process's leader state and job stores, so it
+# always runs on a thread here, even when SCHEDULER_EXECUTOR=process
+LEADER_EXECUTOR = "leader"
+# Leader-only jobs live in a persistent job store so missed runs survive restarts
+PERSISTENT_JOBSTORE = "persistent"
+WEEKLY_COMMISSIONS_JOB_ID = "weekly_team_commissions"
+instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_is_leader = False
+
+# Per-job run metrics, keyed by job id
+_job_metrics: dict[str, dict] = {}
+_metrics_lock = threading.Lock()
+
+
+def _build_executor():
+    """Dedicated pool for job functions, so blocking work never shares the API's threads."""
+    if settings.scheduler_executor == "process":
+        return ProcessPoolExecutor(max_workers=settings.scheduler_max_workers)
+    return ThreadPoolExecutor(max_workers=settings.scheduler_max_workers)
+
+
+def _job_metrics_entry(job_id: str) -> dict:
+    return _job_metrics.setdefault(
+        job_id,
+        {
+            "runs": 0,
+            "failures": 0,
+            "missed": 0,
+            "skipped_max_instances": 0,
+            "running": False,
+            "last_duration_seconds": None,
+            "max_duration_seconds": None,
+            "total_duration_seconds": 0.0,
+            "last_finished_at": None,
+        },
+    )
+
+
+def _timed_job(job_id: str):
+    """Time a job function where it actually runs, in the executor.
+
+    The duration is returned (or attached to the raised exception) so the
+    event listener can record it even when the job ran in a pool process.
+    ``running`` is only tracked for jobs run on this process's threads.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _metrics_lock:
+                _job_metrics_entry(job_id)["running"] = True
+            started = time_module.monotonic()
+            try:
+                func(*args, **kwargs)
+            except BaseException as exc:
+                exc.job_duration_seconds = time_module.monotonic() - started
+                raise
+            finally:
+                with _metrics_lock:
+                    _job_metrics_entry(job_id)["running"] = False
+            return time_module.monotonic() - started
+        return wrapper
+    return decorate
+
+
+def _record_job_event(event) -> None:
+    """Track run counts, outcomes and durations per job."""
+    duration = None
+    if event.code == EVENT_JOB_EXECUTED and isinstance(event.retval, float):
+        duration = event.retval
+    elif event.code == EVENT_JOB_ERROR:
+        duration = getattr(event.exception, "job_duration_seconds", None)
+
+    with _metrics_lock:
+        metrics = _job_metrics_entry(event.job_id)
+        if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+            metrics["runs"] += 1
+            metrics["last_finished_at"] = datetime.now().isoformat()
+            if event.code == EVENT_JOB_ERROR:
+                metrics["failures"] += 1
+            if duration is not None:
+                metrics["last_duration_seconds"] = duration
+                metrics["total_duration_seconds"] += duration
+                metrics["max_duration_seconds"] = max(metrics["max_duration_seconds"] or 0.0, duration)
+                logger.info(f"Scheduled job {event.job_id} finished in {duration:.2f}s")
+        elif event.code == EVENT_JOB_MISSED:
+            metrics["missed"] += 1
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            metrics["skipped_max_instances"] += 1
+
+    if event.jobstore == PERSISTENT_JOBSTORE and event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED):
+        _record_job_run(event, duration)
+
+
+def _record_job_run(event, duration: float | None) -> None:
+    """Persist run history for leader-only jobs so it outlives the worker."""
+    if event.code == EVENT_JOB_ERROR:
+        status = "error"
+    elif event.code == EVENT_JOB_MISSED:
+        status = "missed"
+    else:
+        status = "success"
+    try:
+        with db_session() as conn:
+            conn.execute(
+                """
+                INSERT INTO scheduler_job_runs
+                    (job_id, status, scheduled_run_time, duration_seconds, error, instance_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    event.job_id,
+                    status,
+                    event.scheduled_run_time.isoformat() if event.scheduled_run_time else None,
+                    duration,
+                    repr(event.exception)[:1000] if getattr(event, "exception", None) else None,
+                    instance_id,
+                ),
+            )
+    except Exception as e:
+        logger.error(f"Error recording run of job {event.job_id}: {e}", exc_info=True)
+
+
+def is_scheduler_leader() -> bool:
+    """Whether this process currently holds the scheduler lease."""
+    return _is_leader
+
+
+def _attach_persistent_jobs() -> None:
+    """Load leader-only jobs from the persistent store, creating them on first use.
+
+    Existing jobs keep their stored next run time, so a run that fell due while
+    no leader was up is caught up (coalesced into one) within the misfire grace.
+    """
+    if scheduler is None:
+        return
+    try:
+        scheduler.add_jobstore(SQLiteJobStore(), PERSISTENT_JOBSTORE)
+    except ValueError:
+        pass  # already attached
+    try:
+        # Every Monday at 4:00 PM (16:00)
+        scheduler.add_job(
+            process_weekly_commissions_job,
+            trigger=CronTrigger(day_of_week='mon', hour=16, minute=0),
+            id=WEEKLY_COMMISSIONS_JOB_ID,
+            name='Process Weekly Team Commissions',
+            jobstore=PERSISTENT_JOBSTORE,
+        )
+    except ConflictingIdError:
+        pass
+
+
+def _detach_persistent_jobs() -> None:
+    """Stop running leader-only jobs here without deleting them from the store."""
+    if scheduler is None:
+        return
+    try:
+        scheduler.remove_jobstore(PERSISTENT_JOBSTORE)
+    except KeyError:
+        pass  # never attached
+
+
+@_timed_job(LEADER_HEARTBEAT_JOB_ID)
+def leader_heartbeat_job() -> None:
+    """Acquire or renew the scheduler lease and toggle leader-only jobs.
+
+    Every worker runs this; exactly one holds the lease at a time, and a
+    crashed leader is replaced once its lease expires.
+    """
+    global _is_leader
+    try:
+        acquired = try_acquire_lease(LEADER_LEASE_NAME, instance_id, settings.scheduler_lease_ttl_seconds)
+    except Exception as e:
+        logger.error(f"Error renewing scheduler lease: {e}", exc_info=True)
+        acquired = False
+
+    if acquired and not _is_leader:
+        logger.info(f"Scheduler leadership acquired by {instance_id}")
+        _attach_persistent_jobs()
+    elif not acquired and _is_leader:
+        logger.warning(f"Scheduler leadership lost by {instance_id}")
+        _detach_persistent_jobs()
+    _is_leader = acquired
+
+
+def submit_background_job(func, *args, name: str) -> str:
+    """Run ``func(*args)`` once, now, on the scheduler's job executor.
+
+    For long admin-triggered work that should not occupy a request thread.
+    Returns the APScheduler job id.
+    """
+    if scheduler is None:
+        raise RuntimeError("Scheduler is not running")
+    job = scheduler.add_job(func, args=list(args), name=name, misfire_grace_time=None)
+    return job.id
+
+
+def get_job_metrics() -> dict[str, dict]:
+    """Get run counts and durations for scheduled jobs in this process."""
+    with _metrics_lock:
+        return {job_id: dict(metrics) for job_id, metrics in _job_metrics.items()}
+
+
+def _format_timestamp(value) -> str | None:
+    return value.isoformat() if value else None
+
+
+def get_scheduled_jobs() -> list[dict]:
+    """List persistent jobs with their next run time and most recent run.
+
+    Reads the job store directly, so any worker can answer, leader or not.
+    """
+    store = SQLiteJobStore()
+    jobs = store.get_all_jobs()
+    metrics = get_job_metrics()
+
+    with db_session(read_only=True) as conn:
+        runs = conn.execute(
+            """
+            SELECT r.job_id, r.status, r.scheduled_run_time, r.finished_at,
+                   r.duration_seconds, r.error, r.instance_id, s.run_count, s.failed_count,
+                   s.avg_duration_seconds
+            FROM scheduler_job_runs r
+            JOIN (
+                SELECT job_id, MAX(id) AS last_id, COUNT(*) AS run_count,
+                       SUM(status = 'error') AS failed_count,
+                       AVG(duration_seconds) AS avg_duration_seconds
+                FROM scheduler_job_runs
+                GROUP BY job_id
+            ) s ON s.last_id = r.id
+            """
+        ).fetchall()
+    last_runs = {row["job_id"]: dict(row) for row in runs}
+
+    result = []
+    for job in jobs:
+        last_run = last_runs.get(job.id)
+        result.append({
+            "id": job.id,
+            "name": job.name,
+            "trigger": str(job.trigger),
+            "next_run_time": _format_timestamp(job.next_run_time),
+            "coalesce": job.coalesce,
+            "misfire_grace_time": job.misfire_grace_time,
+            "last_run": last_run,
+            "local_metrics": metrics.get(job.id),
+        })
+    return result
+
+
+def get_scheduler_status() -> dict:
+    """Leader lease, this worker's role and all persistent jobs."""
+    return {
+        "instance_id": instance_id,
+        "is_leader": _is_leader,
+        "lease": get_lease(LEADER_LEASE_NAME),
+        "jobs": get_scheduled_jobs(),
+    }
+
 
 def start_scheduler() -> AsyncIOScheduler:
     """Start the scheduler for weekly commission processing.
     
-    Schedules commission processing every Monday between 4-7 PM.
+    Schedules commission processing every Monday between 4-7 PM. Jobs run in
+    a dedicated thread (or process) pool sized by ``scheduler_max_workers``,
+    never on the event loop or the request threadpool. The commission job is
+    kept in the SQLite job store and only loaded on the leader worker.
     """
     global scheduler
     
     if scheduler is not None:
         return scheduler
     
-    scheduler = AsyncIOScheduler()
+    scheduler = AsyncIOScheduler(
+        executors={"default": _build_executor(), LEADER_EXECUTOR: ThreadPoolExecutor(max_workers=1)},
+        job_defaults={
+            "max_instances": 1,
+            "coalesce": True,
+            "misfire_grace_time": settings.scheduler_misfire_grace_seconds,
+        },
+    )
+    scheduler.add_listener(
+        _record_job_event,
+        EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES,
+    )
     
-    # Schedule weekly commission processing
-    # Every Monday at 4:00 PM (16:00)
+    # Leader election heartbeat, first run immediately. Weekly commission
+    # processing is attached once this worker becomes leader.
     scheduler.add_job(
-        process_weekly_commissions_job,
-        trigger=CronTrigger(day_of_week='mon', hour=16, minute=0),
-        id='weekly_team_commissions',
-        name='Process Weekly Team Commissions',
+        leader_heartbeat_job,
+        trigger=IntervalTrigger(seconds=settings.scheduler_lease_renew_seconds),
+        id=LEADER_HEARTBEAT_JOB_ID,
+        name='Scheduler Leader Heartbeat',
+        executor=LEADER_EXECUTOR,
         replace_existing=True,
+        next_run_time=datetime.now(),
     )
     
     scheduler.start()
-    logger.info("Scheduler started - Weekly commissions scheduled for Mondays at 4:00 PM")
+    logger.info("Scheduler started - Weekly commissions scheduled for Mondays at 4:00 PM on the leader worker")
     
     return scheduler
 
 
 def stop_scheduler() -> None:
-    """Stop the scheduler."""
-    global scheduler
+    """Stop the scheduler and hand over leadership."""
+    global scheduler, _is_leader
     if scheduler is not None:
         scheduler.shutdown()
         scheduler = None
         logger.info("Scheduler stopped")
+    if _is_leader:
+        _is_leader = False
+        try:
+            release_lease(LEADER_LEASE_NAME, instance_id)
+        except Exception as e:
+            logger.error(f"Error releasing scheduler lease: {e}", exc_info=True)
 
 
+@_timed_job(WEEKLY_COMMISSIONS_JOB_ID)
 def process_weekly_commissions_job() -> None:
     """Job function to process weekly team commissions."""
     try:
@@ -65,17 +373,30 @@ def process_weekly_commissions_job() -> None:
         )
     except Exception as e:
         logger.error(f"Error processing weekly commissions: {e}", exc_info=True)
+        # Re-raise so the run is counted and recorded as failed
+        raise
 
 
 @asynccontextmanager
 async def lifespan(app):
     """Lifespan context manager for FastAPI app.
     
-    Starts scheduler on startup and stops on shutdown.
+    Verifies the schema version, then starts scheduler and compensation worker
+    on startup and stops them on shutdown. Migrations and seed data are applied
+    separately with ``python -m app.cli migrate`` / ``seed``.
     """
     # Startup
+    if settings.db_auto_migrate:
+        initialize_database()
+    else:
+        verify_schema_version()
     start_scheduler()
+    start_compensation_worker()
     yield
     # Shutdown
+    stop_compensation_worker()
     stop_scheduler()
+    shutdown_hash_executor()
+    close_async_reader()
+    close_pool()
 
@@ -1,13 +1,25 @@
 """User persistence helpers."""
 
+import functools
 import uuid
 from typing import Optional
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
-from ..core.security import hash_password, verify_password
-from ..database.session import db_session
+from ..config import MAX_REFERRAL_DEPTH, settings
+from ..core.cache import TTLCache
+from ..core.security import hash_password
+from ..database.async_session import run_read
+from ..database.session import db_session, on_commit
 from ..models.schemas import AuthCredentials, UserCreate, UserProfile, UserPublic
+from .passwords import check_login_password
+
+
+# UserPublic by id for request authentication. Writers that change any
+# UserPublic field invalidate the entry once their unit of work commits; the
+# TTL bounds staleness from changes made by other workers.
+_user_cache = TTLCache(settings.user_cache_max_entries, settings.user_cache_ttl_seconds)
 
 
 def _row_to_user(row) -> UserPublic:
@@ -73,14 +85,58 @@ def get_user_row_by_email(email: str):
         return conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
 
 
+def _select_user(conn, user_id: int):
+    return conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+
+
 def get_user_by_id(user_id: int) -> UserPublic | None:
     with db_session() as conn:
-        row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        row = _select_user(conn, user_id)
     if row:
         return _row_to_user(row)
     return None
 
 
+def get_cached_user_by_id(user_id: int) -> UserPublic | None:
+    """Get a user through the in-process cache (for authentication, not for balance checks)."""
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = get_user_by_id(user_id)
+        if user is not None:
+            _user_cache.set(user_id, user)
+    return user
+
+
+async def get_cached_user_by_id_async(user_id: int) -> UserPublic | None:
+    """``get_cached_user_by_id`` reading misses through the async reader."""
+    user = _user_cache.get(user_id)
+    if user is None:
+        row = await run_read(_select_user, user_id)
+        if row:
+            user = _row_to_user(row)
+            _user_cache.set(user_id, user)
+    return user
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a user's cache entry after the enclosing unit of work commits.
+
+    Invalidating before the commit would let a concurrent lookup re-cache the
+    old row for a full TTL. Outside a ``transaction()``, call this after the
+    ``db_session()`` block that wrote the change.
+    """
+    on_commit(functools.partial(_user_cache.invalidate, user_id))
+
+
+def invalidate_cached_users(user_ids) -> None:
+    """``invalidate_cached_user`` for many users."""
+    on_commit(functools.partial(_user_cache.invalidate_many, list(user_ids)))
+
+
+def get_user_cache_stats() -> dict:
+    return _user_cache.stats()
+
+
 def get_user_profile_by_id(user_id: int) -> UserProfile | None:
     with db_session() as conn:
         row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
@@ -105,7 +161,8 @@ def generate_referral_code() -> str:
             return code
 
 
-def create_user(payload: UserCreate) -> UserPublic:
+def create_user(payload: UserCreate, password_hash: Optional[str] = None) -> UserPublic:
+    """Create a user, hashing the password unless ``password_hash`` is given."""
     if get_user_row_by_email(payload.email):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
 
@@ -133,7 +190,7 @@ def create_user(payload: UserCreate) -> UserPublic:
             (
                 payload.full_name,
                 payload.email,
-                hash_password(payload.password),
+                password_hash or hash_password(payload.password),
                 payload.phone,
                 payload.aadhaar,
                 payload.pan,
@@ -147,26 +204,52 @@ def create_user(payload: UserCreate) -> UserPublic:
         )
         user_id = cursor.lastrowid
 
-        # Update referrer's team size and direct referrals
+        # Extend the closure, then count the new member in every upline's team size
         if referrer_id:
+            # Extend the referral closure table: the new user inherits the
+            # referrer's uplines one level deeper, plus the referrer itself,
+            # capped at MAX_REFERRAL_DEPTH like the backfill.
             cursor.execute(
                 """
-                UPDATE users
-                SET team_size = team_size + 1,
-                    direct_referrals = direct_referrals + 1
-                WHERE id = ?
+                INSERT OR IGNORE INTO user_ancestors (ancestor_id, descendant_id, depth)
+                SELECT ?, ?, 1
+                UNION ALL
+                SELECT ancestor_id, ?, depth + 1
+                FROM user_ancestors
+                WHERE descendant_id = ? AND depth < ?
                 """,
-                (referrer_id,)
+                (referrer_id, user_id, user_id, referrer_id, MAX_REFERRAL_DEPTH)
             )
 
+            upline_ids = [
+                row["id"]
+                for row in cursor.execute(
+                    """
+                    UPDATE users
+                    SET team_size = team_size + 1,
+                        direct_referrals = direct_referrals + (id = ?)
+                    WHERE id IN (SELECT ancestor_id FROM user_ancestors WHERE descendant_id = ?)
+                    RETURNING id
+                    """,
+                    (referrer_id, user_id)
+                ).fetchall()
+            ]
+
+    if referrer_id:
+        invalidate_cached_users(upline_ids)
+
     created = get_user_by_id(user_id)
     assert created is not None
     return created
 
 
-def authenticate_user(credentials: AuthCredentials) -> UserPublic:
-    row = get_user_row_by_email(credentials.email)
-    if not row or not verify_password(credentials.password, row["password_hash"]):
+async def authenticate_user(credentials: AuthCredentials) -> UserPublic:
+    """Check credentials, upgrading the stored hash to the current hashing policy.
+
+    Hashing runs in the password hashing pool, database access in the threadpool.
+    """
+    row = await run_in_threadpool(get_user_row_by_email, credentials.email)
+    if not row or not await check_login_password("users", row, credentials.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     return _row_to_user(row)
 
@@ -178,6 +261,7 @@ def update_user_profile(user_id: int, updates: dict) -> UserProfile:
 
     with db_session() as conn:
         conn.execute(f"UPDATE users SET {fields}, updated_at = CURRENT_TIMESTAMP WHERE id = ?", values)
+    invalidate_cached_user(user_id)
 
     updated = get_user_profile_by_id(user_id)
     if not updated:
@@ -258,4 +342,5 @@ def update_user_rank(user_id: int, new_rank: str) -> None:
             "UPDATE users SET rank = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
             (new_rank, user_id)
         )
+    invalidate_cached_user(user_id)
 
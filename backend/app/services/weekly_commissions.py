@@ -1,9 +1,281 @@
 """Weekly team commission calculation and processing."""
 
+import uuid
 from datetime import datetime, timedelta
 from typing import List
-from ..database.session import db_session
-from ..services.compensation import create_transaction
+from ..config import settings
+from ..database.session import db_session, transaction
+from .users import invalidate_cached_users
+
+
+def _row_to_run(row) -> dict:
+    return {
+        "run_id": row["run_id"],
+        "status": row["status"],
+        "max_queue_id": row["max_queue_id"],
+        "chunk_size": row["chunk_size"],
+        "last_user_id": row["last_user_id"],
+        "users_processed": row["users_processed"],
+        "total_commissions": row["total_commissions"],
+        "transactions_created": row["transactions_created"],
+        "last_error": row["last_error"],
+        "started_at": row["started_at"],
+        "updated_at": row["updated_at"],
+        "completed_at": row["completed_at"],
+    }
+
+
+def get_commission_run(run_id: str) -> dict | None:
+    """Get a settlement run and its checkpoint."""
+    with db_session() as conn:
+        row = conn.execute("SELECT * FROM commission_runs WHERE run_id = ?", (run_id,)).fetchone()
+    return _row_to_run(row) if row else None
+
+
+def list_commission_runs(limit: int = 20) -> List[dict]:
+    """Get the most recent settlement runs."""
+    with db_session() as conn:
+        rows = conn.execute(
+            "SELECT * FROM commission_runs ORDER BY started_at DESC, rowid DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [_row_to_run(row) for row in rows]
+
+
+def get_commission_run_chunks(run_id: str) -> List[dict]:
+    """Get the completed chunk checkpoints of a settlement run."""
+    with db_session() as conn:
+        rows = conn.execute(
+            """
+            SELECT start_user_id, end_user_id, users_processed, total_commissions, completed_at
+            FROM commission_run_chunks
+            WHERE run_id = ?
+            ORDER BY id
+            """,
+            (run_id,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_incomplete_commission_runs() -> List[dict]:
+    """Get settlement runs that were interrupted or failed."""
+    with db_session() as conn:
+        rows = conn.execute(
+            "SELECT * FROM commission_runs WHERE status != 'completed' ORDER BY started_at, rowid"
+        ).fetchall()
+    return [_row_to_run(row) for row in rows]
+
+
+def start_commission_run(chunk_size: int | None = None) -> str:
+    """Create a settlement run over the currently pending queue items.
+    
+    Refuses to start while another run is incomplete; resume that one first.
+    """
+    run_id = uuid.uuid4().hex
+    with transaction() as conn:
+        incomplete = conn.execute(
+            "SELECT run_id FROM commission_runs WHERE status != 'completed' LIMIT 1"
+        ).fetchone()
+        if incomplete:
+            raise ValueError(f"Commission run {incomplete['run_id']} is not completed; resume it first")
+
+        # Snapshot: queue items up to the current max id belong to this run.
+        # Items queued while the run is in progress get higher ids and wait for the next run.
+        max_row = conn.execute("SELECT MAX(id) as max_id FROM team_commission_queue").fetchone()
+        conn.execute(
+            """
+            INSERT INTO commission_runs (run_id, max_queue_id, chunk_size)
+            VALUES (?, ?, ?)
+            """,
+            (run_id, max_row["max_id"] or 0, chunk_size or settings.commission_run_chunk_size)
+        )
+    return run_id
+
+
+def _settle_next_chunk(run_id: str) -> bool:
+    """Settle the next range of users in a run.
+    
+    The chunk's transactions, wallet credits, queue updates and checkpoint all
+    commit together, so a crash never pays a user twice. Returns False when
+    there is nothing left to settle.
+    """
+    with transaction() as conn:
+        run = conn.execute("SELECT * FROM commission_runs WHERE run_id = ?", (run_id,)).fetchone()
+        if not run:
+            raise ValueError("Commission run not found")
+        if run["status"] == "completed":
+            return False
+
+        start_user_id = run["last_user_id"]
+        end_row = conn.execute(
+            """
+            SELECT MAX(user_id) as end_user_id FROM (
+                SELECT DISTINCT user_id
+                FROM team_commission_queue
+                WHERE status = 'pending' AND id <= ? AND user_id > ?
+                ORDER BY user_id
+                LIMIT ?
+            )
+            """,
+            (run["max_queue_id"], start_user_id, run["chunk_size"])
+        ).fetchone()
+        end_user_id = end_row["end_user_id"]
+        if end_user_id is None:
+            return False
+
+        range_params = (run["max_queue_id"], start_user_id, end_user_id)
+
+        # One weekly commission transaction per user
+        conn.execute(
+            """
+            INSERT INTO compensation_transactions
+                (user_id, type, amount, description, reference_id, settlement_run_id)
+            SELECT
+                user_id,
+                'team_commission',
+                SUM(commission_amount),
+                'Weekly team commission: ' || SUM(sales_units) || ' units, '
+                    || COUNT(*) || ' commission(s)',
+                NULL,
+                ?
+            FROM team_commission_queue
+            WHERE status = 'pending' AND id <= ? AND user_id > ? AND user_id <= ?
+            GROUP BY user_id
+            HAVING SUM(commission_amount) > 0
+            """,
+            (run_id, *range_params)
+        )
+
+        # Credit wallets for every user paid in this chunk
+        conn.execute(
+            """
+            UPDATE users
+            SET wallet_balance = wallet_balance + t.amount,
+                total_earnings = total_earnings + t.amount
+            FROM (
+                SELECT user_id, amount
+                FROM compensation_transactions
+                WHERE settlement_run_id = ? AND user_id > ? AND user_id <= ?
+            ) AS t
+            WHERE users.id = t.user_id
+            """,
+            (run_id, start_user_id, end_user_id)
+        )
+        paid_user_ids = [
+            row["user_id"]
+            for row in conn.execute(
+                """
+                SELECT user_id FROM compensation_transactions
+                WHERE settlement_run_id = ? AND user_id > ? AND user_id <= ?
+                """,
+                (run_id, start_user_id, end_user_id)
+            )
+        ]
+        invalidate_cached_users(paid_user_ids)
+
+        # Mark the chunk's queue items as processed. Items are only queued with a
+        # positive amount, so every pending user in the range was paid above.
+        conn.execute(
+            """
+            UPDATE team_commission_queue
+            SET status = 'processed',
+                processed_at = CURRENT_TIMESTAMP,
+                settlement_run_id = ?
+            WHERE status = 'pending' AND id <= ? AND user_id > ? AND user_id <= ?
+            """,
+            (run_id, *range_params)
+        )
+
+        # Paid users' pending totals now only cover items queued after the snapshot
+        conn.execute(
+            """
+            UPDATE user_compensation_summary
+            SET pending_weekly_commissions = COALESCE((
+                    SELECT SUM(q.commission_amount)
+                    FROM team_commission_queue q
+                    WHERE q.user_id = user_compensation_summary.user_id AND q.status = 'pending'
+                ), 0),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id IN (
+                SELECT user_id FROM compensation_transactions
+                WHERE settlement_run_id = ? AND user_id > ? AND user_id <= ?
+            )
+            """,
+            (run_id, start_user_id, end_user_id)
+        )
+
+        totals = conn.execute(
+            """
+            SELECT COUNT(*) as transactions, COALESCE(SUM(amount), 0) as total
+            FROM compensation_transactions
+            WHERE settlement_run_id = ? AND user_id > ? AND user_id <= ?
+            """,
+            (run_id, start_user_id, end_user_id)
+        ).fetchone()
+
+        # Checkpoint
+        conn.execute(
+            """
+            INSERT INTO commission_run_chunks
+                (run_id, start_user_id, end_user_id, users_processed, total_commissions)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (run_id, start_user_id + 1, end_user_id, totals["transactions"], totals["total"])
+        )
+        conn.execute(
+            """
+            UPDATE commission_runs
+            SET last_user_id = ?,
+                users_processed = users_processed + ?,
+                transactions_created = transactions_created + ?,
+                total_commissions = total_commissions + ?,
+                status = 'running',
+                last_error = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ?
+            """,
+            (end_user_id, totals["transactions"], totals["transactions"], totals["total"], run_id)
+        )
+    return True
+
+
+def resume_commission_run(run_id: str, max_chunks: int | None = None) -> dict:
+    """Settle a run chunk by chunk from its last checkpoint.
+    
+    With max_chunks, stops after that many chunks so a large settlement can be
+    split across a maintenance window; the run stays resumable.
+    """
+    chunks = 0
+    try:
+        while max_chunks is None or chunks < max_chunks:
+            if not _settle_next_chunk(run_id):
+                with db_session() as conn:
+                    conn.execute(
+                        """
+                        UPDATE commission_runs
+                        SET status = 'completed', completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                        WHERE run_id = ? AND status != 'completed'
+                        """,
+                        (run_id,)
+                    )
+                break
+            chunks += 1
+    except Exception as exc:
+        with db_session() as conn:
+            conn.execute(
+                """
+                UPDATE commission_runs
+                SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE run_id = ?
+                """,
+                (str(exc)[:1000], run_id)
+            )
+        raise
+
+    run = get_commission_run(run_id)
+    if not run:
+        raise ValueError("Commission run not found")
+    return run
 
 
 def process_weekly_team_commissions() -> dict:
@@ -15,66 +287,28 @@ def process_weekly_team_commissions() -> dict:
     3. Update wallet balances
     4. Mark queue items as processed
     
+    Interrupted runs are resumed from their checkpoint first. The new run is
+    settled in user_id chunks, each one set-based and committed atomically
+    with its checkpoint in commission_runs.
+    
     Returns:
         dict with processing statistics
     """
-    stats = {
-        "users_processed": 0,
-        "total_commissions": 0.0,
-        "transactions_created": 0,
+    for incomplete in get_incomplete_commission_runs():
+        resume_commission_run(incomplete["run_id"])
+
+    run = resume_commission_run(start_commission_run())
+    return {
+        "settlement_run_id": run["run_id"],
+        "users_processed": run["users_processed"],
+        "total_commissions": run["total_commissions"],
+        "transactions_created": run["transactions_created"],
     }
-    
-    with db_session() as conn:
-        # Get all pending commissions grouped by user
-        pending_commissions = conn.execute(
-            """
-            SELECT 
-                user_id,
-                SUM(commission_amount) as total_commission,
-                SUM(sales_units) as total_sales_units,
-                COUNT(*) as commission_count
-            FROM team_commission_queue
-            WHERE status = 'pending'
-            GROUP BY user_id
-            """
-        ).fetchall()
-        
-        for row in pending_commissions:
-            user_id = row["user_id"]
-            total_commission = row["total_commission"]
-            total_sales_units = row["total_sales_units"]
-            commission_count = row["commission_count"]
-            
-            if total_commission > 0:
-                # Create compensation transaction
-                create_transaction(
-                    user_id=user_id,
-                    transaction_type="team_commission",
-                    amount=total_commission,
-                    description=f"Weekly team commission: {total_sales_units} units, {commission_count} commission(s)",
-                    reference_id=None,
-                )
-                
-                # Mark all queue items for this user as processed
-                conn.execute(
-                    """
-                    UPDATE team_commission_queue
-                    SET status = 'processed', processed_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ? AND status = 'pending'
-                    """,
-                    (user_id,)
-                )
-                
-                stats["users_processed"] += 1
-                stats["total_commissions"] += total_commission
-                stats["transactions_created"] += 1
-    
-    return stats
 
 
 def get_pending_commissions_count() -> int:
     """Get count of pending commission queue items."""
-    with db_session() as conn:
+    with db_session(read_only=True) as conn:
         row = conn.execute(
             "SELECT COUNT(*) as count FROM team_commission_queue WHERE status = 'pending'"
         ).fetchone()
@@ -83,7 +317,7 @@ def get_pending_commissions_count() -> int:
 
 def get_user_pending_commission(user_id: int) -> float:
     """Get total pending commission amount for a user."""
-    with db_session() as conn:
+    with db_session(read_only=True) as conn:
         row = conn.execute(
             """
             SELECT SUM(commission_amount) as total
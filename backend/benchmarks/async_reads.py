@@ -0,0 +1,168 @@
+"""Benchmark read endpoints served sync (threadpool) against async (reader threads).
+
+Starts the app under uvicorn with extra ``/bench/sync/...`` routes that serve
+the same data the way the read routers used to (``def`` endpoints calling
+``db_session`` in Starlette's threadpool), then drives both variants with a
+fixed number of concurrent keep-alive clients and reports requests per second
+and latency percentiles.
+
+Run from the backend directory:
+
+    python -m benchmarks.async_reads --clients 50 200 1000 --duration 10
+
+Client and server share the machine, so compare the variants with each other
+rather than reading the numbers as absolute capacity.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PATHS = {
+    "books": ("/bench/sync/books", "/api/books/"),
+    "packages": ("/bench/sync/packages", "/api/packages/"),
+    "book": ("/bench/sync/books/1", "/api/books/1"),
+}
+
+
+def create_bench_app():
+    """App factory for uvicorn: the real app plus the legacy sync read routes."""
+    from fastapi import APIRouter
+
+    from app.main import create_app
+    from app.models.schemas import Book, Package
+    from app.services.books import get_book, list_books
+    from app.services.packages import list_packages
+
+    router = APIRouter()
+
+    @router.get("/books", response_model=list[Book])
+    def sync_books() -> list[Book]:
+        return list_books()
+
+    @router.get("/books/{book_id}", response_model=Book)
+    def sync_book(book_id: int) -> Book:
+        return get_book(book_id)
+
+    @router.get("/packages", response_model=list[Package])
+    def sync_packages() -> list[Package]:
+        return list_packages()
+
+    app = create_app()
+    app.include_router(router, prefix="/bench/sync")
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.async_reads:create_bench_app",
+            "--factory", "--port", str(port), "--log-level", "warning", "--no-access-log",
+            "--backlog", "4096",
+        ],
+        env=env,
+    )
+    import httpx
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/packages/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def _client(port: int, request: bytes, stop_at: float, latencies: list[float]) -> int:
+    """One keep-alive connection issuing requests back to back; returns the error count."""
+    errors = 0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+    return errors
+
+
+async def _drive(port: int, path: str, clients: int, duration: float) -> tuple[int, int, list[float]]:
+    # A minimal HTTP/1.1 client keeps client-side overhead well below the server's,
+    # so the measured rate reflects the server rather than the load generator
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode()
+    latencies: list[float] = []
+    stop_at = time.perf_counter() + duration
+    results = await asyncio.gather(
+        *(_client(port, request, stop_at, latencies) for _ in range(clients)),
+        return_exceptions=True,
+    )
+    errors = sum(result if isinstance(result, int) else 1 for result in results)
+    return len(latencies), errors, latencies
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    return statistics.quantiles(samples, n=100)[int(fraction * 100) - 1] if len(samples) > 1 else samples[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per measurement")
+    parser.add_argument("--endpoint", choices=sorted(PATHS), default="books")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env["COMPENSATION_WORKER_ENABLED"] = "false"
+    os.environ.update(env)
+
+    from app.database import initialize_database
+
+    initialize_database()
+
+    port = _free_port()
+    server = _start_server(port, env)
+    try:
+        print(f"endpoint: {args.endpoint}, {args.duration:.0f}s per run")
+        print(f"{'clients':>8} {'variant':>8} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+        for clients in args.clients:
+            for variant, path in zip(("sync", "async"), PATHS[args.endpoint]):
+                ok, errors, latencies = asyncio.run(_drive(port, path, clients, args.duration))
+                print(
+                    f"{clients:>8} {variant:>8} {ok / args.duration:>9.0f} "
+                    f"{_percentile(latencies, 0.50) * 1000:>9.1f} "
+                    f"{_percentile(latencies, 0.99) * 1000:>9.1f} {errors:>7}"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
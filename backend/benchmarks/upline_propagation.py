@@ -0,0 +1,91 @@
+"""Benchmark per-sale team sales propagation at different upline depths.
+
+Compares the legacy path (one SELECT per level to walk the upline, then one
+UPDATE per ancestor) with the set-based ``propagate_sales_to_upline`` driven
+by the ``user_ancestors`` closure table.
+
+Run from the backend directory:
+
+    python -m benchmarks.upline_propagation --depths 100 1000 10000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def _seed_chain(conn, depth: int) -> int:
+    """Create a single leg of ``depth`` uplines above a buyer and return the buyer id."""
+    conn.execute("DELETE FROM user_ancestors")
+    conn.execute("DELETE FROM users")
+    conn.executemany(
+        "INSERT INTO users (id, full_name, email, password_hash, referral_code, referrer_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (user_id, f"Bench {user_id}", f"bench{user_id}@example.com", "x", f"B{user_id}", user_id - 1 or None)
+            for user_id in range(1, depth + 2)
+        ],
+    )
+    buyer_id = depth + 1
+    # Only the buyer's closure rows are needed to measure a sale.
+    conn.executemany(
+        "INSERT INTO user_ancestors (ancestor_id, descendant_id, depth) VALUES (?, ?, ?)",
+        [(buyer_id - level, buyer_id, level) for level in range(1, depth + 1)],
+    )
+    return buyer_id
+
+
+def _legacy_propagate(db_session, buyer_id: int, sales_units: int) -> None:
+    upline_chain = []
+    current_user_id = buyer_id
+    while current_user_id:
+        with db_session() as conn:
+            row = conn.execute("SELECT referrer_id FROM users WHERE id = ?", (current_user_id,)).fetchone()
+        if not row or not row["referrer_id"]:
+            break
+        upline_chain.append(row["referrer_id"])
+        current_user_id = row["referrer_id"]
+
+    with db_session() as conn:
+        for referrer_id in upline_chain:
+            conn.execute(
+                "UPDATE users SET team_sales_count = COALESCE(team_sales_count, 0) + ? WHERE id = ?",
+                (sales_units, referrer_id),
+            )
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    from app.database import db_session, initialize_database
+    from app.services.network import propagate_sales_to_upline
+
+    initialize_database()
+
+    print(f"{'depth':>8} {'legacy (ms)':>12} {'set-based (ms)':>16} {'speedup':>9}")
+    for depth in args.depths:
+        with db_session() as conn:
+            buyer_id = _seed_chain(conn, depth)
+
+        legacy = _time(lambda: _legacy_propagate(db_session, buyer_id, 1), args.repeat)
+        set_based = _time(lambda: propagate_sales_to_upline(buyer_id, 1), args.repeat)
+        print(f"{depth:>8} {legacy * 1000:>12.2f} {set_based * 1000:>16.2f} {legacy / set_based:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()